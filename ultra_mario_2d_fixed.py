@@ -11,9 +11,20 @@ CRITICAL FIX: Ensures perfect pixel alignment between tiles and window
 
 import pygame
 import math
-import random
-import time
+from collections import deque
+from functools import partial
 from enum import IntEnum
+from operator import attrgetter
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the helpers below run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
 
 # Initialize Pygame
 pygame.init()
@@ -29,10 +40,34 @@ JUMP_FORCE = -10.0
 MOVE_SPEED = 4.0
 MAX_FALL_SPEED = 12.0
 FPS = 60
+STEP_MS = 1000 / FPS  # Simulation step; run() updates at this fixed rate
+MAX_LAG_MS = 5 * STEP_MS  # Catch-up cap after a stall, so updates never spiral
 
 # Ensure pixel-perfect rendering
 TILES_WIDE = WINDOW_WIDTH // SCALED_TILE  # 18.75 tiles
 TILES_HIGH = WINDOW_HEIGHT // SCALED_TILE  # Exactly 12 tiles
+SCALED_TILE_SHIFT = 5  # Pixel -> tile index is int(v) >> SCALED_TILE_SHIFT
+assert SCALED_TILE == 1 << SCALED_TILE_SHIFT
+HUD_HEIGHT = 40  # Top band covered by render_hud
+
+# Entity storage
+ENTITY_CAPACITY = 64  # Initial size of the EntityPool arrays
+PARTICLE_CAPACITY = 512  # Fixed size of the particle SoA buffers
+PARTICLE_LIFE = 60  # Frames
+FLOATING_TEXT_CAPACITY = 64  # Oldest text is dropped beyond this
+TEXT_CACHE_SIZE = 512  # Rendered text surfaces kept by render_text
+RAND_POOL_SIZE = 4096  # Pre-drawn gameplay random numbers, a power of two
+
+# Sine lookup for per-frame animation:
+# sin(a) ~= SINE_TABLE[int(a * SINE_SCALE) & SINE_MASK]
+SINE_TABLE_SIZE = 1024  # A power of two, so wrapping is a mask
+SINE_MASK = SINE_TABLE_SIZE - 1
+SINE_SCALE = SINE_TABLE_SIZE / (2 * math.pi)
+SINE_TABLE = tuple(np.sin(np.arange(SINE_TABLE_SIZE) * (2 * np.pi / SINE_TABLE_SIZE)).tolist())
+
+# Unit (cos, sin) of the ten star outline points, alternating outer/inner
+STAR_DIRS = tuple((math.cos(math.pi / 2 + i * math.pi / 5), math.sin(math.pi / 2 + i * math.pi / 5))
+                  for i in range(10))
 
 # Game States
 class GameState(IntEnum):
@@ -75,6 +110,80 @@ class TileType(IntEnum):
     WATER = 19
     CORAL = 20
 
+# Plain-int copies of the animated tiles for tile_blit's per-frame compares;
+# reading an IntEnum member costs several times more than a global int
+LAVA_TILE = int(TileType.LAVA)
+WATER_TILE = int(TileType.WATER)
+
+# Tile art variants, see UltraMario2D.build_tile_atlas
+class TileTheme(IntEnum):
+    OVERWORLD = 0
+    UNDERGROUND = 1
+    CASTLE = 2
+
+# Entity Types, stored per entity in EntityPool.type
+class EntityType(IntEnum):
+    GOOMBA = 0
+    KOOPA = 1
+    BOWSER = 2
+    MUSHROOM = 3
+    FIREFLOWER = 4
+    STAR = 5
+    COIN = 6
+    FIREBALL = 7
+
+# Plain-int copies of the types masked every frame in the entity update and
+# render passes, for the same reason as LAVA_TILE
+GOOMBA_ENTITY = int(EntityType.GOOMBA)
+KOOPA_ENTITY = int(EntityType.KOOPA)
+STAR_ENTITY = int(EntityType.STAR)
+COIN_ENTITY = int(EntityType.COIN)
+FIREBALL_ENTITY = int(EntityType.FIREBALL)
+
+# Spawn (width, height, vel_x) of each entity type, indexed by EntityType
+ENTITY_SPECS = (
+    (SCALED_TILE, SCALED_TILE, -1),          # GOOMBA
+    (SCALED_TILE, SCALED_TILE, -1),          # KOOPA
+    (SCALED_TILE * 2, SCALED_TILE * 2, -1),  # BOWSER
+    (SCALED_TILE, SCALED_TILE, 2),           # MUSHROOM
+    (SCALED_TILE, SCALED_TILE, 2),           # FIREFLOWER
+    (SCALED_TILE, SCALED_TILE, 2),           # STAR
+    (SCALED_TILE, SCALED_TILE, 0),           # COIN
+    (12, 12, 0),                             # FIREBALL
+)
+
+# Solid tile lookup, indexed by tile value. Read directly by every collision
+# path, including the compiled helpers (Numba freezes it as a constant). It covers
+# every uint8 value, so any byte in the tile grid is a valid index.
+SOLID_LUT = np.zeros(256, dtype=bool)
+SOLID_LUT[[TileType.GROUND, TileType.BRICK, TileType.QUESTION,
+           TileType.USED, TileType.HARD, TileType.PIPE_TL,
+           TileType.PIPE_TR, TileType.PIPE_BL, TileType.PIPE_BR,
+           TileType.BRIDGE, TileType.CASTLE]] = True
+
+# Pipe quarters, grouped by which edge carries a highlight
+PIPE_TILES = frozenset({TileType.PIPE_TL, TileType.PIPE_TR, TileType.PIPE_BL, TileType.PIPE_BR})
+PIPE_LEFT_TILES = frozenset({TileType.PIPE_TL, TileType.PIPE_BL})
+PIPE_RIGHT_TILES = frozenset({TileType.PIPE_TR, TileType.PIPE_BR})
+PIPE_TOP_TILES = frozenset({TileType.PIPE_TL, TileType.PIPE_TR})
+
+# Held-input bits of UltraMario2D.input_state
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_JUMP = 4
+INPUT_DOWN = 8
+INPUT_RUN = 16
+
+# Key bindings: key code -> the input_state bit it holds
+KEY_BINDINGS = {
+    pygame.K_LEFT: INPUT_LEFT, pygame.K_a: INPUT_LEFT,
+    pygame.K_RIGHT: INPUT_RIGHT, pygame.K_d: INPUT_RIGHT,
+    pygame.K_UP: INPUT_JUMP, pygame.K_w: INPUT_JUMP,
+    pygame.K_SPACE: INPUT_JUMP, pygame.K_z: INPUT_JUMP,
+    pygame.K_DOWN: INPUT_DOWN, pygame.K_s: INPUT_DOWN,
+    pygame.K_x: INPUT_RUN, pygame.K_LSHIFT: INPUT_RUN, pygame.K_RSHIFT: INPUT_RUN,
+}
+
 # Colors - NES Palette
 SKY_BLUE = (92, 148, 252)
 UNDERGROUND_BLACK = (0, 0, 0)
@@ -100,17 +209,347 @@ AXE_SILVER = (180, 180, 200)
 BOWSER_GREEN = (0, 140, 0)
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
+COLOR_KEY = (255, 0, 255)  # Transparent color of cached tiles and sprites
+
+# Victory firework colors; build_spark_sprites prerenders one disc for each
+FIREWORK_COLORS = ((255, 110, 110), (255, 180, 100), (255, 240, 120), (140, 250, 140),
+                   (120, 220, 255), (150, 150, 255), (230, 140, 255), WHITE)
+
+# ==================== TILE COLLISION ====================
+# Compiled with Numba when available. The grid is the level's 2-D uint8
+# tile array indexed [ty, tx]; positions and velocities are plain floats.
+# Pixel to tile conversion shifts instead of dividing, which floors
+# negative coordinates to the out-of-bounds tile -1.
+
+@njit(cache=True, fastmath=True)
+def _is_solid(grid, tx, ty):
+    """Check if a tile is solid, treating out-of-bounds as empty"""
+    if tx < 0 or tx >= grid.shape[1] or ty < 0 or ty >= grid.shape[0]:
+        return False
+    return SOLID_LUT[grid[ty, tx]]
+
+@njit(cache=True, fastmath=True)
+def _resolve_horiz(grid, x, y, w, h, vx):
+    """Resolve horizontal movement against tiles, returns (x, vel_x)"""
+    start_tile_y = int(y) >> SCALED_TILE_SHIFT
+    end_tile_y = min((int(y + h - 1) >> SCALED_TILE_SHIFT) + 1, grid.shape[0])
+    
+    if vx > 0:  # Moving right
+        tile_x = int(x + w) >> SCALED_TILE_SHIFT
+        for ty in range(start_tile_y, end_tile_y):
+            if _is_solid(grid, tile_x, ty):
+                return tile_x * SCALED_TILE - w - 1.0, 0.0
+    elif vx < 0:  # Moving left
+        tile_x = int(x) >> SCALED_TILE_SHIFT
+        for ty in range(start_tile_y, end_tile_y):
+            if _is_solid(grid, tile_x, ty):
+                return (tile_x + 1) * SCALED_TILE + 1.0, 0.0
+    return x, vx
+
+@njit(cache=True, fastmath=True)
+def _resolve_vert(grid, ground_height, x, y, w, h, vy):
+    """Resolve vertical movement against tiles
+    
+    ground_height[tx] is the row of the topmost solid tile in each column.
+    Returns (y, vel_y, on_ground, hit_tx, hit_ty); hit_tx is -1 unless a
+    block was bumped from below.
+    """
+    start_tile_x = int(x + 2) >> SCALED_TILE_SHIFT
+    end_tile_x = min((int(x + w - 2) >> SCALED_TILE_SHIFT) + 1, grid.shape[1])
+    
+    if vy > 0:  # Falling
+        tile_y = int(y + h) >> SCALED_TILE_SHIFT
+        for tx in range(max(start_tile_x, 0), end_tile_x):
+            # Anything above the column's top solid tile is air
+            if tile_y >= ground_height[tx] and _is_solid(grid, tx, tile_y):
+                # CRITICAL FIX: Align player exactly to tile boundary
+                return tile_y * SCALED_TILE - h * 1.0, 0.0, True, -1, -1
+    elif vy < 0:  # Rising
+        tile_y = int(y) >> SCALED_TILE_SHIFT
+        for tx in range(start_tile_x, end_tile_x):
+            if _is_solid(grid, tx, tile_y):
+                return (tile_y + 1) * SCALED_TILE * 1.0, 0.0, False, tx, tile_y
+    return y, vy, False, -1, -1
+
+# ==================== PLAYER PHYSICS ====================
+
+@njit(cache=True, fastmath=True)
+def _step_player(grid, ground_height, x, y, vx, vy, w, h, on_ground, inputs,
+                 jump_held, underwater, camera_x):
+    """Advance the player by one frame: input, gravity and tile collision
+    
+    inputs is the INPUT_* bitfield of held keys. Returns
+    (x, y, vel_x, vel_y, on_ground, jump_held, facing, hit_tx, hit_ty)
+    where facing is 1/-1 when the player turned right/left, 0 if
+    unchanged, and hit_tx is -1 unless a block was bumped from below.
+    """
+    left = (inputs & INPUT_LEFT) != 0
+    right = (inputs & INPUT_RIGHT) != 0
+    jump = (inputs & INPUT_JUMP) != 0
+    run = (inputs & INPUT_RUN) != 0
+    
+    # Horizontal movement
+    accel = 0.4 if run else 0.2
+    max_speed = MOVE_SPEED * 1.5 if run else MOVE_SPEED
+    facing = 0
+    
+    if left and not right:
+        vx -= accel
+        if vx < -max_speed:
+            vx = -max_speed
+        facing = -1
+    elif right and not left:
+        vx += accel
+        if vx > max_speed:
+            vx = max_speed
+        facing = 1
+    else:
+        # Friction
+        if vx > 0:
+            vx -= 0.15
+            if vx < 0:
+                vx = 0.0
+        elif vx < 0:
+            vx += 0.15
+            if vx > 0:
+                vx = 0.0
+    
+    # Jumping
+    if jump and on_ground and not jump_held:
+        vy = JUMP_FORCE
+        jump_held = True
+    
+    # Variable jump height
+    if not jump and vy < -3:
+        vy = -3.0
+    
+    # Gravity
+    if underwater:
+        vy += GRAVITY * 0.3
+        if vy > 2:
+            vy = 2.0
+    else:
+        vy += GRAVITY
+        if vy > MAX_FALL_SPEED:
+            vy = MAX_FALL_SPEED
+    
+    # Apply movement with collision
+    x, vx = _resolve_horiz(grid, x + vx, y, w, h, vx)
+    
+    # Keep player in bounds
+    if x < 0:
+        x = 0.0
+    if x < camera_x and camera_x > 0:
+        x = camera_x
+    
+    # Apply vertical movement
+    y, vy, on_ground, hit_tx, hit_ty = _resolve_vert(grid, ground_height, x, y + vy, w, h, vy)
+    return x, y, vx, vy, on_ground, jump_held, facing, hit_tx, hit_ty
+
+# ==================== PARTICLES ====================
+
+@njit(cache=True)
+def _step_particles(xy, vel, life, color, count):
+    """Advance the first count particles one frame, packing survivors to the front
+    
+    Works in place on the SoA buffers and returns the new live count.
+    """
+    gravity = np.float32(0.3)
+    kept = 0
+    for i in range(count):
+        remaining = life[i] - 1
+        if remaining <= 0:
+            continue
+        xy[kept, 0] = xy[i, 0] + vel[i, 0]
+        xy[kept, 1] = xy[i, 1] + vel[i, 1]
+        vel[kept, 0] = vel[i, 0]
+        vel[kept, 1] = vel[i, 1] + gravity
+        life[kept] = remaining
+        color[kept, 0] = color[i, 0]
+        color[kept, 1] = color[i, 1]
+        color[kept, 2] = color[i, 2]
+        kept += 1
+    return kept
+
+# ==================== LEVEL GENERATION ====================
+# Numeric cores of the level generators, compiled with Numba when
+# available. Each seeds the NumPy random state it draws from, so a level
+# depends only on the seed passed in by UltraMario2D.
+
+@njit(cache=True)
+def _add_pipe(tiles, x, y, height):
+    """Add a pipe to the tile grid, skipped if it does not fit"""
+    level_height, level_width = tiles.shape
+    if x < 0 or x + 1 >= level_width or y < 0 or y + height >= level_height:
+        return
+    
+    # Top of pipe
+    tiles[y, x] = TileType.PIPE_TL
+    tiles[y, x + 1] = TileType.PIPE_TR
+    
+    # Body of pipe
+    tiles[y + 1:y + height, x] = TileType.PIPE_BL
+    tiles[y + 1:y + height, x + 1] = TileType.PIPE_BR
+
+@njit(cache=True)
+def _fill_overworld(tiles, world, seed):
+    """Fill an all-air tile grid with an overworld level"""
+    np.random.seed(seed)
+    level_height, level_width = tiles.shape
+    
+    # CRITICAL: Place ground at EXACT bottom rows (10 and 11)
+    tiles[level_height - 2:, :] = TileType.GROUND
+    
+    # Add gaps
+    num_gaps = 3 + world + np.random.randint(0, 4)
+    for i in range(num_gaps):
+        gap_x = 30 + i * (level_width // (num_gaps + 1)) + np.random.randint(-10, 11)
+        gap_width = 2 + np.random.randint(0, 3 + world // 2)
+        tiles[level_height - 2:, gap_x:gap_x + gap_width] = TileType.AIR
+    
+    # Add platforms and blocks
+    for i in range(level_width // 15):
+        x = 10 + i * 15 + np.random.randint(0, 9)
+        y = level_height - 5 - np.random.randint(0, 4)
+        
+        platform_type = np.random.randint(0, 4)
+        if platform_type == 0:
+            # Question blocks
+            length = 1 + np.random.randint(0, 5)
+            row = tiles[y, x:min(x + length, level_width)]
+            row[:] = TileType.BRICK
+            row[np.random.random(row.size) < 0.33] = TileType.QUESTION
+        elif platform_type == 1:
+            # Brick row
+            length = 3 + np.random.randint(0, 6)
+            tiles[y, x:x + length] = TileType.BRICK
+        elif platform_type == 2:
+            # Stairs
+            height = 2 + np.random.randint(0, 5)
+            for h in range(height):
+                ty = level_height - 3 - h
+                if ty >= 0:
+                    tiles[ty, x:x + h + 1] = TileType.HARD
+    
+    # Add pipes
+    for i in range(level_width // 30):
+        x = 20 + i * 30 + np.random.randint(0, 16)
+        pipe_height = 2 + np.random.randint(0, 4)
+        _add_pipe(tiles, x, level_height - 2 - pipe_height, pipe_height)
+    
+    # Add castle at end
+    tiles[level_height - 6:level_height - 2, level_width - 6:level_width - 1] = TileType.CASTLE
+    
+    # Castle entrance
+    tiles[level_height - 3, level_width - 4] = TileType.AIR
+    tiles[level_height - 4, level_width - 4] = TileType.AIR
+
+@njit(cache=True)
+def _place_enemies(level_width, level_height, enemy_count, seed):
+    """Spawn points for the ground enemies of a level
+    
+    Returns (x, y, entity_type, vel_x) as int32 arrays.
+    """
+    np.random.seed(seed)
+    xs = np.empty(enemy_count, dtype=np.int32)
+    ys = np.empty(enemy_count, dtype=np.int32)
+    types = np.empty(enemy_count, dtype=np.int32)
+    vel_xs = np.empty(enemy_count, dtype=np.int32)
+    n = 0
+    for i in range(enemy_count):
+        x = 100 + i * (level_width * SCALED_TILE // enemy_count)
+        
+        # Skip enemies near start and end
+        if x < 200 or x > (level_width - 15) * SCALED_TILE:
+            continue
+        
+        xs[n] = x
+        # Place enemies on ground (row 9)
+        ys[n] = (level_height - 3) * SCALED_TILE
+        # Vary enemy types
+        types[n] = EntityType.GOOMBA if np.random.random() < 0.67 else EntityType.KOOPA
+        vel_xs[n] = -1 if np.random.random() < 0.5 else 1
+        n += 1
+    return xs[:n], ys[:n], types[:n], vel_xs[:n]
+
+class EntityPool:
+    """Structure-of-arrays storage for entity state
+    
+    Row i belongs to UltraMario2D.entities[i]; live rows are packed in
+    [:count], so per-frame passes over all entities are NumPy operations
+    on slices like pool.x[:pool.count].
+    """
+    FIELDS = (("x", np.float32), ("y", np.float32), ("vel_x", np.float32), ("vel_y", np.float32),
+              ("width", np.float32), ("height", np.float32), ("type", np.int8),
+              ("dead", bool), ("active", bool), ("stomped", bool), ("emerging", bool),
+              ("in_shell", bool))
+    
+    def __init__(self, capacity=ENTITY_CAPACITY):
+        for name, dtype in self.FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.count = 0
+    
+    def add(self):
+        """Reserve the next row, doubling every array when full"""
+        if self.count == len(self.x):
+            for name, _ in self.FIELDS:
+                buffer = getattr(self, name)
+                setattr(self, name, np.concatenate((buffer, np.zeros_like(buffer))))
+        self.count += 1
+        return self.count - 1
+    
+    def compact(self, keep):
+        """Keep only the rows listed in keep (ascending), packed to the front"""
+        kept = len(keep)
+        for name, _ in self.FIELDS:
+            buffer = getattr(self, name)
+            buffer[:kept] = buffer[keep]
+        self.count = kept
+    
+    def clear(self):
+        """Drop every row"""
+        self.count = 0
+
+def _entity_field(name):
+    """Entity attribute stored in one of the EntityPool arrays"""
+    get_buffer = attrgetter(name)
+    
+    def fget(self):
+        return get_buffer(self.pool)[self.index].item()
+    
+    def fset(self, value):
+        get_buffer(self.pool)[self.index] = value
+    
+    return property(fget, fset)
 
 class Entity:
-    """Base entity class for all game objects"""
-    def __init__(self, entity_type, x, y):
+    """Base entity class for all game objects
+    
+    Per-frame state lives in the game's EntityPool at row `index`; this
+    object keeps the rest (timers) and the per-entity behavior. Use
+    UltraMario2D.spawn_entity to create entities.
+    """
+    x = _entity_field("x")
+    y = _entity_field("y")
+    vel_x = _entity_field("vel_x")
+    vel_y = _entity_field("vel_y")
+    width = _entity_field("width")
+    height = _entity_field("height")
+    dead = _entity_field("dead")
+    active = _entity_field("active")
+    stomped = _entity_field("stomped")
+    emerging = _entity_field("emerging")
+    in_shell = _entity_field("in_shell")
+    
+    def __init__(self, pool, index, entity_type, x, y):
+        self.pool = pool
+        self.index = index
         self.type = entity_type
+        pool.type[index] = entity_type
         self.x = x
         self.y = y
-        self.vel_x = 0
+        self.width, self.height, self.vel_x = ENTITY_SPECS[entity_type]
         self.vel_y = 0
-        self.width = SCALED_TILE
-        self.height = SCALED_TILE
         self.active = True
         self.dead = False
         self.stomped = False
@@ -118,22 +557,13 @@ class Entity:
         self.in_shell = False
         self.emerging = False
         self.emerge_y = 0
-        
-        # Set initial properties based on type
-        if entity_type in ["goomba", "koopa"]:
-            self.vel_x = -1
-        elif entity_type == "bowser":
-            self.width = SCALED_TILE * 2
-            self.height = SCALED_TILE * 2
-            self.vel_x = -1
-        elif entity_type in ["mushroom", "fireflower", "star"]:
-            self.vel_x = 2
-        elif entity_type == "fireball":
-            self.width = 12
-            self.height = 12
 
     def update(self, game):
-        """Update entity position and behavior"""
+        """Update a stomped or emerging entity
+        
+        Movement of everything else is done for all entities at once in
+        UltraMario2D.update_entities_physics.
+        """
         if self.stomped:
             self.stomp_timer -= 1
             if self.stomp_timer <= 0:
@@ -144,72 +574,6 @@ class Entity:
             self.y -= 1
             if self.y <= self.emerge_y - SCALED_TILE:
                 self.emerging = False
-            return
-        
-        # Apply gravity
-        if self.type not in ["coin"] or self.vel_y != 0:
-            self.vel_y += 0.3
-            if self.vel_y > 8:
-                self.vel_y = 8
-        
-        # Special behaviors
-        if self.type == "star":
-            self.vel_y = -5  # Stars bounce
-        
-        if self.type == "coin" and self.vel_y < 0:
-            self.y += self.vel_y
-            self.vel_y += 0.5
-            if self.vel_y >= 0:
-                self.dead = True
-                game.collect_coin()
-            return
-        
-        # Movement
-        self.x += self.vel_x
-        
-        # Collision detection
-        self.handle_collision(game)
-        
-        # Update Y position
-        self.y += self.vel_y
-
-    def handle_collision(self, game):
-        """Handle collision with tiles"""
-        # Wall collision
-        check_x = int((self.x + self.width) / SCALED_TILE) if self.vel_x > 0 else int(self.x / SCALED_TILE)
-        check_y = int((self.y + self.height / 2) / SCALED_TILE)
-        if game.is_solid_tile(check_x, check_y):
-            self.vel_x = -self.vel_x
-        
-        # Ground collision
-        ground_y = int((self.y + self.height) / SCALED_TILE)
-        ground_x = int((self.x + self.width / 2) / SCALED_TILE)
-        if game.is_solid_tile(ground_x, ground_y):
-            self.y = ground_y * SCALED_TILE - self.height
-            self.vel_y = 0
-        
-        # Cliff detection for walking enemies
-        if self.type in ["goomba", "koopa"] and not self.in_shell:
-            ahead_x = int((self.x + self.width + 4) / SCALED_TILE) if self.vel_x > 0 else int((self.x - 4) / SCALED_TILE)
-            below_y = int((self.y + self.height + 4) / SCALED_TILE)
-            if not game.is_solid_tile(ahead_x, below_y):
-                self.vel_x = -self.vel_x
-
-class Particle:
-    """Particle effect class"""
-    def __init__(self, x, y, vel_x=0, vel_y=0, color=WHITE):
-        self.x = x
-        self.y = y
-        self.vel_x = vel_x
-        self.vel_y = vel_y
-        self.color = color
-        self.life = 60
-
-    def update(self):
-        self.x += self.vel_x
-        self.y += self.vel_y
-        self.vel_y += 0.3
-        self.life -= 1
 
 class FloatingText:
     """Floating score/text display"""
@@ -223,19 +587,70 @@ class FloatingText:
         self.y -= 1
         self.life -= 1
 
+def keyed_surface(width, height, rle=False):
+    """Display-format surface filled with COLOR_KEY, which is its colorkey
+    
+    rle requests RLE acceleration, for sprites that are drawn once and
+    then only blitted.
+    """
+    surface = pygame.Surface((width, height)).convert()
+    surface.fill(COLOR_KEY)
+    surface.set_colorkey(COLOR_KEY, pygame.RLEACCEL if rle else 0)
+    return surface
+
 class UltraMario2D:
     def __init__(self):
         # Setup display with exact dimensions
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Ultra Mario 2D Bros - TRUE FIXED VERSION")
-        
-        # Ensure pixel-perfect rendering
-        self.screen.set_alpha(None)  # Disable alpha blending for speed
+        # Batched blit for draws that need no dirty rects back: pygame-ce's
+        # fblits, or blits without building the return list elsewhere
+        self.fblits = getattr(self.screen, "fblits", None) or partial(self.screen.blits, doreturn=False)
+        # Every surface built below is convert()ed to the display format set
+        # above (text uses convert_alpha() for its antialiasing), so blits skip
+        # per-pixel format conversion. Transparency comes from COLOR_KEY on
+        # converted surfaces rather than SRCALPHA, and convert() must run
+        # after set_mode.
         
         self.clock = pygame.time.Clock()
+        
+        # Dirty rects: screen regions changed this frame and last frame
+        self._dirty = []
+        self._prev_dirty = []
+        self._last_view = None
+        self._full_redraw = True
+        self._hud_state = None  # Counters shown by _hud_blits
+        self._hud_blits = []  # render_hud's blit list for _hud_state
         self.font_small = pygame.font.Font(None, 16)
         self.font_medium = pygame.font.Font(None, 24)
         self.font_large = pygame.font.Font(None, 36)
+        self._text_cache = {}  # (text, font id, color) -> Surface
+        self._digit_glyphs = {}  # (font id, color) -> (digit surfaces, x offsets)
+        self.sprites = self.build_sprites()
+        self.mario_sprites = self.build_mario_sprites()
+        self.spark_sprites = self.build_spark_sprites()
+        self.hud_labels = self.build_hud_labels()
+        self.overlay = self.build_overlay()  # shared by pause and level complete
+        self.build_tile_atlas()
+        self.parallax_layers = self.build_parallax_layers()
+        
+        # Player-entity collision handlers, keyed by EntityType
+        self.collision_handlers = {
+            EntityType.GOOMBA: self.touch_enemy,
+            EntityType.KOOPA: self.touch_enemy,
+            EntityType.BOWSER: self.touch_enemy,
+            EntityType.MUSHROOM: self.collect_powerup,
+            EntityType.FIREFLOWER: self.collect_powerup,
+            EntityType.STAR: self.collect_powerup,
+            EntityType.COIN: self.touch_coin,
+            EntityType.FIREBALL: self.touch_enemy,
+        }
+        
+        # Random source for level generation, which draws its numbers in
+        # arrays, and for the pool of pre-drawn gameplay numbers, see rand()
+        self._rng = np.random.default_rng()
+        self._randbuf = self._rng.random(RAND_POOL_SIZE)
+        self._randidx = 0
         
         # Game state
         self.game_state = GameState.TITLE
@@ -245,7 +660,7 @@ class UltraMario2D:
         self.coins = 0
         self.score = 0
         self.time_remaining = 400
-        self.last_time_update = time.time()
+        self.frame_counter = 0  # Gameplay frames, one time unit every FPS frames
         
         # Player state
         self.player_x = 0
@@ -253,21 +668,20 @@ class UltraMario2D:
         self.player_vel_x = 0
         self.player_vel_y = 0
         self.player_power = PowerState.SMALL
+        self._pw = SCALED_TILE - 4  # Player hitbox, see update_player_size
+        self._ph = SCALED_TILE
         self.player_on_ground = False
         self.player_facing_right = True
         self.invincibility_frames = 0
         self.star_timer = 0
         self.anim_frame = 0
         self.anim_timer = 0
+        self.prompt_visible = True  # Blinking prompts shown this frame, set by render
         self.player_dead = False
         self.death_timer = 0
         
-        # Input state
-        self.left_pressed = False
-        self.right_pressed = False
-        self.jump_pressed = False
-        self.run_pressed = False
-        self.down_pressed = False
+        # Input state: INPUT_* bits of the held keys
+        self.input_state = 0
         self.jump_held = False
         
         # Camera
@@ -276,10 +690,29 @@ class UltraMario2D:
         # Level data
         self.level_width = 0
         self.level_height = 12  # EXACTLY 12 tiles for 384px height
-        self.current_tiles = []
-        self.entities = []
-        self.particles = []
-        self.floating_texts = []
+        # Indexed [ty, tx] but stored column-major, so a column is contiguous
+        self.current_tiles = np.zeros((self.level_height, 0), dtype=np.uint8, order="F")
+        # Same bytes as current_tiles; scalar reads through it return plain ints
+        self.tile_view = memoryview(self.current_tiles)
+        self.ground_height = np.zeros(0, dtype=np.int16)  # Top solid row per column
+        self.anim_tile_columns = np.zeros(0, dtype=np.intp)  # Sorted tx of each animated tile
+        self.anim_tiles = []  # (x, y, tile_type) per animated tile, same order
+        self.bg_surface = None  # Pre-rendered static tiles, built by load_level
+        self.tile_src_rects = {}  # TileType -> (atlas, area) for the level theme
+        self.entities = []  # Entity objects, parallel to the rows of entity_pool
+        self.entity_pool = EntityPool()
+        self.fireball_count = 0  # Live FIREBALL entities, kept in step with the pool
+        # Particles: structure-of-arrays, live ones packed in [:particle_count]
+        self.particle_xy = np.zeros((PARTICLE_CAPACITY, 2), dtype=np.float32)
+        self.particle_vel = np.zeros((PARTICLE_CAPACITY, 2), dtype=np.float32)
+        self.particle_life = np.zeros(PARTICLE_CAPACITY, dtype=np.int16)
+        self.particle_color = np.zeros((PARTICLE_CAPACITY, 3), dtype=np.uint8)
+        self.particle_count = 0
+        self._particle_next = 0  # Slot spawn_particle overwrites when the buffers are full
+        # Compile the particle kernel now (a no-op with count 0) rather than
+        # stalling the first brick break or victory screen
+        _step_particles(self.particle_xy, self.particle_vel, self.particle_life, self.particle_color, 0)
+        self.floating_texts = deque(maxlen=FLOATING_TEXT_CAPACITY)
         
         # Level-specific
         self.is_underground = False
@@ -303,8 +736,14 @@ class UltraMario2D:
         print(f"Window: {WINDOW_WIDTH}x{WINDOW_HEIGHT} (Exactly {TILES_HIGH} tiles high)")
 
     def run(self):
-        """Main game loop"""
+        """Main game loop
+        
+        Updates run in fixed STEP_MS steps, as many as the elapsed time
+        calls for, and each loop renders once, so game speed does not depend
+        on how fast frames are presented.
+        """
         running = True
+        lag = 0.0
         while running:
             # Handle events
             for event in pygame.event.get():
@@ -315,30 +754,36 @@ class UltraMario2D:
                 elif event.type == pygame.KEYUP:
                     self.handle_key_up(event.key)
             
-            # Update game based on state
-            if self.game_state == GameState.TITLE:
-                self.update_title()
-            elif self.game_state == GameState.PLAYING:
-                self.update_game()
-            elif self.game_state == GameState.PAUSED:
-                pass  # Paused - no updates
-            elif self.game_state == GameState.GAME_OVER:
-                self.update_game_over()
-            elif self.game_state == GameState.LEVEL_COMPLETE:
-                self.update_level_complete()
-            elif self.game_state == GameState.WORLD_INTRO:
-                self.update_world_intro()
-            elif self.game_state == GameState.VICTORY:
-                self.update_victory()
+            # Update game based on state, one step per STEP_MS elapsed
+            while lag >= STEP_MS:
+                self.update()
+                lag -= STEP_MS
             
             # Render
             self.render()
             
-            # Cap framerate
-            self.clock.tick(FPS)
+            # Cap framerate and bank the elapsed time for the next updates
+            lag = min(lag + self.clock.tick(FPS), MAX_LAG_MS)
         
         pygame.quit()
 
+    def update(self):
+        """Advance the current state by one fixed step"""
+        if self.game_state == GameState.TITLE:
+            self.update_title()
+        elif self.game_state == GameState.PLAYING:
+            self.update_game()
+        elif self.game_state == GameState.PAUSED:
+            pass  # Paused - no updates
+        elif self.game_state == GameState.GAME_OVER:
+            self.update_game_over()
+        elif self.game_state == GameState.LEVEL_COMPLETE:
+            self.update_level_complete()
+        elif self.game_state == GameState.WORLD_INTRO:
+            self.update_world_intro()
+        elif self.game_state == GameState.VICTORY:
+            self.update_victory()
+
     def update_title(self):
         """Update title screen"""
         self.anim_timer += 1
@@ -354,10 +799,9 @@ class UltraMario2D:
             return
         
         # Update timers
-        current_time = time.time()
-        if current_time - self.last_time_update >= 1.0:
+        self.frame_counter += 1
+        if self.frame_counter % FPS == 0:
             self.time_remaining -= 1
-            self.last_time_update = current_time
             if self.time_remaining <= 0:
                 self.kill_player()
         
@@ -380,23 +824,22 @@ class UltraMario2D:
         self.update_entities()
         
         # Update particles
-        for particle in self.particles[:]:
-            particle.update()
-            if particle.life <= 0:
-                self.particles.remove(particle)
+        self.update_particles()
         
         # Update floating texts
-        for text in self.floating_texts[:]:
+        texts = self.floating_texts
+        for text in texts:
             text.update()
-            if text.life <= 0:
-                self.floating_texts.remove(text)
+        # All texts live equally long, so they expire from the front
+        while texts and texts[0].life <= 0:
+            texts.popleft()
         
         # Update camera
         self.update_camera()
         
         # Check for level completion
         if self.flag_pole_x >= 0 and not self.flag_descending and self.level_complete_timer == 0:
-            player_tile_x = int(self.player_x / SCALED_TILE)
+            player_tile_x = int(self.player_x) >> SCALED_TILE_SHIFT
             if abs(player_tile_x - self.flag_pole_x) < 1.5:
                 self.trigger_flag_sequence()
         
@@ -417,163 +860,75 @@ class UltraMario2D:
                 if self.player_x > self.camera_x + WINDOW_WIDTH + 50:
                     self.advance_level()
 
+    def update_player_size(self):
+        """Cache the player hitbox for the current power state"""
+        self._pw = SCALED_TILE - 4
+        self._ph = SCALED_TILE if self.player_power == PowerState.SMALL else SCALED_TILE * 2
+
     def update_player(self):
         """Update player physics and movement"""
+        self.update_player_size()
         if self.level_complete_timer > 0:
             return
         
-        # Horizontal movement
-        accel = 0.4 if self.run_pressed else 0.2
-        max_speed = MOVE_SPEED * 1.5 if self.run_pressed else MOVE_SPEED
-        
-        if self.left_pressed and not self.right_pressed:
-            self.player_vel_x -= accel
-            if self.player_vel_x < -max_speed:
-                self.player_vel_x = -max_speed
-            self.player_facing_right = False
-        elif self.right_pressed and not self.left_pressed:
-            self.player_vel_x += accel
-            if self.player_vel_x > max_speed:
-                self.player_vel_x = max_speed
-            self.player_facing_right = True
-        else:
-            # Friction
-            if self.player_vel_x > 0:
-                self.player_vel_x -= 0.15
-                if self.player_vel_x < 0:
-                    self.player_vel_x = 0
-            elif self.player_vel_x < 0:
-                self.player_vel_x += 0.15
-                if self.player_vel_x > 0:
-                    self.player_vel_x = 0
-        
-        # Jumping
-        if self.jump_pressed and self.player_on_ground and not self.jump_held:
-            self.player_vel_y = JUMP_FORCE
-            self.player_on_ground = False
-            self.jump_held = True
-        
-        # Variable jump height
-        if not self.jump_pressed and self.player_vel_y < -3:
-            self.player_vel_y = -3
-        
-        # Gravity
-        if self.is_underwater:
-            self.player_vel_y += GRAVITY * 0.3
-            if self.player_vel_y > 2:
-                self.player_vel_y = 2
-        else:
-            self.player_vel_y += GRAVITY
-            if self.player_vel_y > MAX_FALL_SPEED:
-                self.player_vel_y = MAX_FALL_SPEED
-        
-        # Apply movement with collision
-        self.player_x += self.player_vel_x
-        self.handle_horizontal_collision()
-        
-        # Keep player in bounds
-        if self.player_x < 0:
-            self.player_x = 0
-        if self.player_x < self.camera_x and self.camera_x > 0:
-            self.player_x = self.camera_x
-        
-        # Apply vertical movement
-        self.player_y += self.player_vel_y
-        self.handle_vertical_collision()
+        # Movement, gravity and tile collision in one compiled step
+        (self.player_x, self.player_y, self.player_vel_x, self.player_vel_y,
+         self.player_on_ground, self.jump_held, facing, hit_tx, hit_ty) = _step_player(
+            self.current_tiles, self.ground_height, float(self.player_x), float(self.player_y),
+            float(self.player_vel_x), float(self.player_vel_y), self._pw, self._ph,
+            self.player_on_ground, self.input_state, self.jump_held, self.is_underwater,
+            float(self.camera_x))
+        if facing:
+            self.player_facing_right = facing > 0
+        if hit_tx >= 0:
+            self.hit_block(hit_tx, hit_ty)
         
         # Check for death by falling
         if self.player_y > self.level_height * SCALED_TILE + 50:
             self.kill_player()
 
-    def handle_horizontal_collision(self):
-        """Handle player horizontal collision with tiles"""
-        player_width = SCALED_TILE - 4
-        player_height = SCALED_TILE if self.player_power == PowerState.SMALL else SCALED_TILE * 2
-        
-        start_tile_y = int(self.player_y / SCALED_TILE)
-        end_tile_y = int((self.player_y + player_height - 1) / SCALED_TILE)
-        
-        if self.player_vel_x > 0:  # Moving right
-            tile_x = int((self.player_x + player_width) / SCALED_TILE)
-            for ty in range(start_tile_y, min(end_tile_y + 1, self.level_height)):
-                if self.is_solid_tile(tile_x, ty):
-                    self.player_x = tile_x * SCALED_TILE - player_width - 1
-                    self.player_vel_x = 0
-                    break
-        elif self.player_vel_x < 0:  # Moving left
-            tile_x = int(self.player_x / SCALED_TILE)
-            for ty in range(start_tile_y, min(end_tile_y + 1, self.level_height)):
-                if self.is_solid_tile(tile_x, ty):
-                    self.player_x = (tile_x + 1) * SCALED_TILE + 1
-                    self.player_vel_x = 0
-                    break
-
-    def handle_vertical_collision(self):
-        """Handle player vertical collision with tiles"""
-        player_width = SCALED_TILE - 4
-        player_height = SCALED_TILE if self.player_power == PowerState.SMALL else SCALED_TILE * 2
-        
-        self.player_on_ground = False
-        
-        start_tile_x = int((self.player_x + 2) / SCALED_TILE)
-        end_tile_x = int((self.player_x + player_width - 2) / SCALED_TILE)
-        
-        if self.player_vel_y > 0:  # Falling
-            tile_y = int((self.player_y + player_height) / SCALED_TILE)
-            for tx in range(start_tile_x, min(end_tile_x + 1, self.level_width)):
-                if self.is_solid_tile(tx, tile_y):
-                    # CRITICAL FIX: Align player exactly to tile boundary
-                    self.player_y = tile_y * SCALED_TILE - player_height
-                    self.player_vel_y = 0
-                    self.player_on_ground = True
-                    break
-        elif self.player_vel_y < 0:  # Rising
-            tile_y = int(self.player_y / SCALED_TILE)
-            for tx in range(start_tile_x, min(end_tile_x + 1, self.level_width)):
-                if self.is_solid_tile(tx, tile_y):
-                    self.player_y = (tile_y + 1) * SCALED_TILE
-                    self.player_vel_y = 0
-                    self.hit_block(tx, tile_y)
-                    break
-
     def hit_block(self, tx, ty):
         """Handle block hit by player"""
         if tx < 0 or tx >= self.level_width or ty < 0 or ty >= self.level_height:
             return
         
-        tile = self.current_tiles[ty][tx]
+        tile = self.tile_view[ty, tx]
         if tile == TileType.QUESTION:
-            self.current_tiles[ty][tx] = TileType.USED
+            self.current_tiles[ty, tx] = TileType.USED
+            self.redraw_tile(tx, ty)
             # Spawn coin or power-up
-            if random.random() < 0.25 and self.player_power == PowerState.SMALL:
+            if self.rand() < 0.25 and self.player_power == PowerState.SMALL:
                 self.spawn_powerup(tx * SCALED_TILE, ty * SCALED_TILE - SCALED_TILE)
             else:
                 self.spawn_coin(tx * SCALED_TILE, ty * SCALED_TILE - SCALED_TILE)
             self.score += 100
         elif tile == TileType.BRICK and self.player_power != PowerState.SMALL:
-            self.current_tiles[ty][tx] = TileType.AIR
+            self.current_tiles[ty, tx] = TileType.AIR
+            self.redraw_tile(tx, ty)
+            if ty == self.ground_height[tx]:
+                # Top of the column broke, the next solid tile below takes over
+                below = SOLID_LUT[self.current_tiles[ty:, tx]]
+                self.ground_height[tx] = ty + below.argmax() if below.any() else self.level_height
             self.create_brick_particles(tx * SCALED_TILE, ty * SCALED_TILE)
             self.score += 50
 
     def spawn_coin(self, x, y):
         """Spawn a coin entity"""
-        coin = Entity("coin", x + SCALED_TILE // 2 - 6, y)
+        coin = self.spawn_entity(EntityType.COIN, x + SCALED_TILE // 2 - 6, y)
         coin.vel_y = -10
-        self.entities.append(coin)
 
     def spawn_powerup(self, x, y):
         """Spawn a power-up"""
         if self.player_power == PowerState.SMALL:
-            powerup_type = "mushroom"
-        elif random.random() < 0.33:
-            powerup_type = "star"
+            powerup_type = EntityType.MUSHROOM
+        elif self.rand() < 0.33:
+            powerup_type = EntityType.STAR
         else:
-            powerup_type = "fireflower"
+            powerup_type = EntityType.FIREFLOWER
         
-        powerup = Entity(powerup_type, x, y + SCALED_TILE)
+        powerup = self.spawn_entity(powerup_type, x, y + SCALED_TILE)
         powerup.emerging = True
         powerup.emerge_y = y
-        self.entities.append(powerup)
 
     def create_brick_particles(self, x, y):
         """Create particle effects for broken bricks"""
@@ -582,85 +937,277 @@ class UltraMario2D:
             py = y + (i // 2) * SCALED_TILE // 2
             vel_x = -3 if i % 2 == 0 else 3
             vel_y = -8 if i < 2 else -5
-            self.particles.append(Particle(px, py, vel_x, vel_y, BRICK_RED))
+            self.spawn_particle(px, py, vel_x, vel_y, BRICK_RED)
+
+    def render_text(self, text, font, color):
+        """Rendered text surface, cached so repeated strings are rasterized once"""
+        key = (text, id(font), color)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            if len(self._text_cache) >= TEXT_CACHE_SIZE:
+                # Evict the oldest entry
+                del self._text_cache[next(iter(self._text_cache))]
+            surface = font.render(text, True, color).convert_alpha()
+            self._text_cache[key] = surface
+        return surface
+
+    def centered_text(self, text, font, color, center):
+        """(surface, topleft) of render_text's text centered on center
+        
+        The topleft is what get_rect(center=center) would give, worked out
+        from the cached surface's size without building a Rect.
+        """
+        surface = self.render_text(text, font, color)
+        width, height = surface.get_size()
+        return surface, (center[0] - width // 2, center[1] - height // 2)
+
+    def build_spark_sprites(self):
+        """Prerender a 7x7 colorkeyed disc for every particle color
+        
+        Covers FIREWORK_COLORS plus the gameplay particle colors, which may
+        still be alive when the victory screen starts; render_victory adds
+        any other color on first use.
+        """
+        return {color: self.build_spark_sprite(color)
+                for color in FIREWORK_COLORS + (BRICK_RED, WHITE)}
+
+    def build_spark_sprite(self, color):
+        """7x7 colorkeyed firework disc of the given color
+        
+        Blitted at (x - 3, y - 3) it matches pygame.draw.circle of radius 3
+        centered on (x, y).
+        """
+        surface = keyed_surface(7, 7, rle=True)
+        pygame.draw.circle(surface, color, (3, 3), 3)
+        return surface
+
+    def number_blits(self, value, x, y, font, color, width=0):
+        """(surface, dest) pairs drawing a non-negative integer from cached
+        digit glyphs, zero-padded to width"""
+        key = (id(font), color)
+        glyphs = self._digit_glyphs.get(key)
+        if glyphs is None:
+            # Digits share one advance, so the offset of the i-th digit
+            # matches where font.render would place it in the full string
+            glyphs = ([self.render_text(str(d), font, color) for d in range(10)],
+                      [font.size("0" * i)[0] for i in range(16)])
+            self._digit_glyphs[key] = glyphs
+        digits, offsets = glyphs
+        text = str(value).zfill(width)
+        return [(digits[ord(ch) - 48], (x + offsets[i], y)) for i, ch in enumerate(text)]
+
+    def rand(self):
+        """Next float in [0, 1) from the pre-drawn pool, refilled when used up"""
+        v = self._randbuf[self._randidx]
+        self._randidx = (self._randidx + 1) & (RAND_POOL_SIZE - 1)
+        if self._randidx == 0:
+            self._rng.random(out=self._randbuf)
+        return float(v)
+
+    def rand_uniform(self, a, b):
+        """Float in [a, b) from the pool, like random.uniform"""
+        return a + (b - a) * self.rand()
+
+    def rand_int(self, a, b):
+        """Integer in [a, b] from the pool, like random.randint"""
+        return a + int(self.rand() * (b - a + 1))
+
+    def spawn_entity(self, entity_type, x, y):
+        """Create an entity in the next free row of the entity pool"""
+        entity = Entity(self.entity_pool, self.entity_pool.add(), entity_type, x, y)
+        self.entities.append(entity)
+        if entity_type == EntityType.FIREBALL:
+            self.fireball_count += 1
+        return entity
+
+    def spawn_particle(self, x, y, vel_x, vel_y, color):
+        """Append a particle to the SoA buffers
+        
+        Once they are full, new particles overwrite the slots in turn, so a
+        burst lands in distinct slots instead of all reusing one.
+        """
+        i = self.particle_count
+        if i == PARTICLE_CAPACITY:
+            i = self._particle_next
+            self._particle_next = (i + 1) % PARTICLE_CAPACITY
+        else:
+            self.particle_count = i + 1
+        self.particle_xy[i] = (x, y)
+        self.particle_vel[i] = (vel_x, vel_y)
+        self.particle_life[i] = PARTICLE_LIFE
+        self.particle_color[i] = color
+
+    def update_particles(self):
+        """Advance all particles in one compiled pass and drop expired ones"""
+        if self.particle_count:
+            self.particle_count = _step_particles(self.particle_xy, self.particle_vel, self.particle_life,
+                                                  self.particle_color, self.particle_count)
+
+    def update_entities_physics(self):
+        """Apply gravity and movement to all entities as array operations
+        
+        Tile collision runs between the x and y steps, as it needs the new x
+        and the pre-collision vel_y.
+        """
+        pool = self.entity_pool
+        count = pool.count
+        if count == 0:
+            return
+        x = pool.x[:count]
+        y = pool.y[:count]
+        vel_y = pool.vel_y[:count]
+        types = pool.type[:count]
+        
+        # Stomped and emerging entities only run their own timers
+        busy = pool.stomped[:count] | pool.emerging[:count]
+        for i in np.flatnonzero(busy):
+            self.entities[i].update(self)
+        free = ~busy
+        
+        # Apply gravity, except to coins resting in place
+        falling = free & ((types != COIN_ENTITY) | (vel_y != 0))
+        vel_y[falling] = np.minimum(vel_y[falling] + 0.3, 8)
+        vel_y[free & (types == STAR_ENTITY)] = -5  # Stars bounce
+        
+        # Coins popped from blocks rise and slow, collected once they stop
+        popping = free & (types == COIN_ENTITY) & (vel_y < 0)
+        y[popping] += vel_y[popping]
+        vel_y[popping] += 0.5
+        for i in np.flatnonzero(popping & (vel_y >= 0)):
+            self.entities[i].dead = True
+            self.collect_coin()
+        
+        # Movement
+        moving = np.flatnonzero(free & ~popping)
+        x[moving] += pool.vel_x[moving]
+        self.collide_entities(moving)
+        y[moving] += vel_y[moving]
+
+    def collide_entities(self, rows):
+        """Resolve tile collisions for the entities at the given pool rows"""
+        if len(rows) == 0:
+            return
+        pool = self.entity_pool
+        x = pool.x[rows].astype(np.float64)
+        y = pool.y[rows].astype(np.float64)
+        width = pool.width[rows].astype(np.float64)
+        height = pool.height[rows].astype(np.float64)
+        vel_x = pool.vel_x[rows]
+        
+        # Wall collision
+        check_x = np.where(vel_x > 0, x + width, x).astype(np.int32) >> SCALED_TILE_SHIFT
+        check_y = (y + height / 2).astype(np.int32) >> SCALED_TILE_SHIFT
+        vel_x = np.where(self.solid_batch(check_x, check_y), -vel_x, vel_x)
+        
+        # Ground collision
+        ground_y = (y + height).astype(np.int32) >> SCALED_TILE_SHIFT
+        ground_x = (x + width / 2).astype(np.int32) >> SCALED_TILE_SHIFT
+        grounded = self.solid_batch(ground_x, ground_y)
+        y = np.where(grounded, ground_y * SCALED_TILE - height, y)
+        pool.vel_y[rows[grounded]] = 0
+        
+        # Cliff detection for walking enemies
+        types = pool.type[rows]
+        walking = ((types == GOOMBA_ENTITY) | (types == KOOPA_ENTITY)) & ~pool.in_shell[rows]
+        ahead_x = np.where(vel_x > 0, x + width + 4, x - 4).astype(np.int32) >> SCALED_TILE_SHIFT
+        below_y = (y + height + 4).astype(np.int32) >> SCALED_TILE_SHIFT
+        vel_x = np.where(walking & ~self.solid_batch(ahead_x, below_y), -vel_x, vel_x)
+        
+        pool.y[rows] = y
+        pool.vel_x[rows] = vel_x
 
     def update_entities(self):
         """Update all entities"""
-        for entity in self.entities[:]:
-            entity.update(self)
-            
-            # Remove dead or off-screen entities
-            if entity.dead or entity.x < self.camera_x - 100 or entity.x > self.camera_x + WINDOW_WIDTH + 100:
-                self.entities.remove(entity)
-                continue
-            
-            # Check collision with player
-            if not self.player_dead and self.invincibility_frames == 0 and entity.active:
-                if self.check_entity_collision(entity):
-                    self.handle_entity_collision(entity)
-
-    def check_entity_collision(self, entity):
-        """Check if player collides with entity"""
-        player_width = SCALED_TILE - 4
-        player_height = SCALED_TILE if self.player_power == PowerState.SMALL else SCALED_TILE * 2
-        
-        return (self.player_x < entity.x + entity.width and
-                self.player_x + player_width > entity.x and
-                self.player_y < entity.y + entity.height and
-                self.player_y + player_height > entity.y)
+        self.update_entities_physics()
+        
+        # Remove dead or off-screen entities in one vectorized pass
+        pool = self.entity_pool
+        count = pool.count
+        xs = pool.x[:count]
+        keep_mask = ((xs >= self.camera_x - 100) & (xs <= self.camera_x + WINDOW_WIDTH + 100) &
+                     ~pool.dead[:count])
+        if not keep_mask.all():
+            removed = pool.type[:count][~keep_mask]
+            self.fireball_count -= int(np.count_nonzero(removed == FIREBALL_ENTITY))
+            keep = np.flatnonzero(keep_mask)
+            pool.compact(keep)
+            self.entities = [self.entities[i] for i in keep]
+            for index, entity in enumerate(self.entities):
+                entity.index = index
+        
+        # Check collision with player
+        if self.player_dead or self.invincibility_frames > 0:
+            return
+        for i in np.flatnonzero(self.entity_hit_mask()):
+            # An earlier hit this frame may have hurt the player
+            if self.player_dead or self.invincibility_frames > 0:
+                break
+            self.handle_entity_collision(self.entities[i])
+
+    def entity_hit_mask(self):
+        """Boolean mask of the active entities overlapping the player"""
+        pool = self.entity_pool
+        count = pool.count
+        x = pool.x[:count]
+        y = pool.y[:count]
+        
+        return ((self.player_x < x + pool.width[:count]) &
+                (self.player_x + self._pw > x) &
+                (self.player_y < y + pool.height[:count]) &
+                (self.player_y + self._ph > y) &
+                pool.active[:count])
 
     def handle_entity_collision(self, entity):
         """Handle collision between player and entity"""
-        if entity.type in ["mushroom", "fireflower", "star"]:
-            self.collect_powerup(entity)
-            return
-        
-        if entity.type == "coin":
-            self.collect_coin()
-            entity.dead = True
-            return
-        
-        # Enemy collision
+        self.collision_handlers[entity.type](entity)
+
+    def touch_coin(self, entity):
+        """Player touched a coin entity"""
+        self.collect_coin()
+        entity.dead = True
+
+    def touch_enemy(self, entity):
+        """Player touched an enemy"""
         if self.star_timer > 0:
             self.kill_enemy(entity)
             return
         
         # Check if stomping
-        player_height = SCALED_TILE if self.player_power == PowerState.SMALL else SCALED_TILE * 2
-        if self.player_vel_y > 0 and self.player_y + player_height - 10 < entity.y + entity.height / 2:
+        if self.player_vel_y > 0 and self.player_y + self._ph - 10 < entity.y + entity.height / 2:
             self.stomp_enemy(entity)
         else:
             self.damage_player()
 
     def collect_powerup(self, entity):
         """Collect a power-up"""
-        if entity.type == "mushroom":
+        if entity.type == EntityType.MUSHROOM:
             if self.player_power == PowerState.SMALL:
                 self.player_power = PowerState.BIG
                 self.player_y -= SCALED_TILE
             self.score += 1000
             self.floating_texts.append(FloatingText("+1000", entity.x, entity.y))
-        elif entity.type == "fireflower":
+        elif entity.type == EntityType.FIREFLOWER:
             if self.player_power == PowerState.SMALL:
                 self.player_y -= SCALED_TILE
             self.player_power = PowerState.FIRE
             self.score += 1000
             self.floating_texts.append(FloatingText("+1000", entity.x, entity.y))
-        elif entity.type == "star":
+        elif entity.type == EntityType.STAR:
             self.star_timer = 600
             self.score += 1000
             self.floating_texts.append(FloatingText("+1000", entity.x, entity.y))
         entity.dead = True
+        self.update_player_size()
 
     def stomp_enemy(self, entity):
         """Stomp on enemy"""
-        if entity.type == "goomba":
+        if entity.type == EntityType.GOOMBA:
             entity.stomped = True
             entity.stomp_timer = 30
             entity.active = False
             self.score += 100
             self.floating_texts.append(FloatingText("+100", entity.x, entity.y))
-        elif entity.type == "koopa":
+        elif entity.type == EntityType.KOOPA:
             if entity.in_shell:
                 # Kick shell
                 entity.vel_x = 8 if self.player_facing_right else -8
@@ -679,11 +1226,11 @@ class UltraMario2D:
         self.floating_texts.append(FloatingText("+200", entity.x, entity.y))
         # Create death particles
         for i in range(6):
-            px = entity.x + random.randint(0, entity.width)
-            py = entity.y + random.randint(0, entity.height)
-            vel_x = random.uniform(-3, 3)
-            vel_y = random.uniform(-8, -2)
-            self.particles.append(Particle(px, py, vel_x, vel_y, WHITE))
+            px = entity.x + self.rand_int(0, int(entity.width))
+            py = entity.y + self.rand_int(0, int(entity.height))
+            vel_x = self.rand_uniform(-3, 3)
+            vel_y = self.rand_uniform(-8, -2)
+            self.spawn_particle(px, py, vel_x, vel_y, WHITE)
 
     def damage_player(self):
         """Damage the player"""
@@ -695,6 +1242,7 @@ class UltraMario2D:
         else:
             self.player_power = PowerState.SMALL
             self.invincibility_frames = 120
+            self.update_player_size()
 
     def kill_player(self):
         """Kill the player"""
@@ -758,12 +1306,12 @@ class UltraMario2D:
         # Create firework particles
         if self.victory_timer % 20 == 0:
             for i in range(5):
-                px = random.randint(0, WINDOW_WIDTH)
-                py = random.randint(0, WINDOW_HEIGHT // 2)
-                vel_x = random.uniform(-2, 2)
-                vel_y = random.uniform(-4, 0)
-                color = (random.randint(100, 255), random.randint(100, 255), random.randint(100, 255))
-                self.particles.append(Particle(px, py, vel_x, vel_y, color))
+                px = self.rand_int(0, WINDOW_WIDTH)
+                py = self.rand_int(0, WINDOW_HEIGHT // 2)
+                vel_x = self.rand_uniform(-2, 2)
+                vel_y = self.rand_uniform(-4, 0)
+                color = FIREWORK_COLORS[self.rand_int(0, len(FIREWORK_COLORS) - 1)]
+                self.spawn_particle(px, py, vel_x, vel_y, color)
 
     def trigger_flag_sequence(self):
         """Trigger the flag pole completion sequence"""
@@ -808,6 +1356,7 @@ class UltraMario2D:
         
         # Generate level
         self.generate_level(world, level)
+        self.build_tile_layer()
         
         # Reset player - CRITICAL: Position exactly on ground tiles
         self.player_x = SCALED_TILE * 3
@@ -826,7 +1375,9 @@ class UltraMario2D:
         
         # Clear entities
         self.entities.clear()
-        self.particles.clear()
+        self.entity_pool.clear()
+        self.fireball_count = 0
+        self.particle_count = 0
         self.floating_texts.clear()
         
         # Populate enemies
@@ -834,7 +1385,7 @@ class UltraMario2D:
         
         # Reset timers
         self.time_remaining = 400
-        self.last_time_update = time.time()
+        self.frame_counter = 0  # Gameplay frames, one time unit every FPS frames
         self.flag_descending = False
         self.flag_y = 0
         self.level_complete_timer = 0
@@ -846,8 +1397,11 @@ class UltraMario2D:
     def generate_level(self, world, level):
         """Generate level layout"""
         # Base level width
-        self.level_width = 200 + (world - 1) * 20 + random.randint(0, 50)
-        self.current_tiles = [[TileType.AIR for _ in range(self.level_width)] for _ in range(self.level_height)]
+        self.level_width = 200 + (world - 1) * 20 + int(self._rng.integers(0, 51))
+        # Column-major: collision and ground scans walk down one column
+        self.current_tiles = np.full((self.level_height, self.level_width), TileType.AIR,
+                                     dtype=np.uint8, order="F")
+        self.tile_view = memoryview(self.current_tiles)
         self.flag_pole_x = -1
         self.axe_x = -1
         self.axe_y = -1
@@ -860,90 +1414,43 @@ class UltraMario2D:
             self.generate_underwater_level(world)
         else:
             self.generate_overworld_level(world, level)
+        
+        # Topmost solid row of every column; level_height where there is none
+        solid = SOLID_LUT[self.current_tiles]
+        self.ground_height = np.where(solid.any(axis=0), solid.argmax(axis=0),
+                                      self.level_height).astype(np.int16)
+        
+        # Lava and water positions, column by column; no tile changes into
+        # or out of these after generation
+        animated = (self.current_tiles == TileType.LAVA) | (self.current_tiles == TileType.WATER)
+        columns, rows = np.nonzero(animated.T)
+        self.anim_tile_columns = columns
+        self.anim_tiles = list(zip((columns * SCALED_TILE).tolist(), (rows * SCALED_TILE).tolist(),
+                                   self.current_tiles[rows, columns].tolist()))
 
     def generate_overworld_level(self, world, level):
         """Generate standard overworld level"""
-        # CRITICAL: Place ground at EXACT bottom rows
-        for x in range(self.level_width):
-            self.current_tiles[self.level_height - 1][x] = TileType.GROUND  # Row 11
-            self.current_tiles[self.level_height - 2][x] = TileType.GROUND  # Row 10
-        
-        # Add gaps
-        num_gaps = 3 + world + random.randint(0, 3)
-        for i in range(num_gaps):
-            gap_x = 30 + i * (self.level_width // (num_gaps + 1)) + random.randint(-10, 10)
-            gap_width = 2 + random.randint(0, 2 + world // 2)
-            for x in range(gap_x, min(gap_x + gap_width, self.level_width)):
-                self.current_tiles[self.level_height - 1][x] = TileType.AIR
-                self.current_tiles[self.level_height - 2][x] = TileType.AIR
-        
-        # Add platforms and blocks
-        for i in range(self.level_width // 15):
-            x = 10 + i * 15 + random.randint(0, 8)
-            y = self.level_height - 5 - random.randint(0, 3)
-            
-            platform_type = random.randint(0, 3)
-            if platform_type == 0:
-                # Question blocks
-                length = 1 + random.randint(0, 4)
-                for j in range(length):
-                    if x + j < self.level_width:
-                        self.current_tiles[y][x + j] = TileType.QUESTION if random.random() < 0.33 else TileType.BRICK
-            elif platform_type == 1:
-                # Brick row
-                length = 3 + random.randint(0, 5)
-                for j in range(length):
-                    if x + j < self.level_width:
-                        self.current_tiles[y][x + j] = TileType.BRICK
-            elif platform_type == 2:
-                # Stairs
-                height = 2 + random.randint(0, 4)
-                for h in range(height):
-                    for w in range(h + 1):
-                        ty = self.level_height - 3 - h
-                        tx = x + w
-                        if 0 <= ty < self.level_height and tx < self.level_width:
-                            self.current_tiles[ty][tx] = TileType.HARD
-        
-        # Add pipes
-        for i in range(self.level_width // 30):
-            x = 20 + i * 30 + random.randint(0, 15)
-            pipe_height = 2 + random.randint(0, 3)
-            self.add_pipe(x, self.level_height - 2 - pipe_height, pipe_height)
+        _fill_overworld(self.current_tiles, world, self.generation_seed())
         
         # Add flag pole at end
         self.flag_pole_x = self.level_width - 10
-        
-        # Add castle at end
-        for y in range(self.level_height - 6, self.level_height - 2):
-            for x in range(self.level_width - 6, self.level_width - 1):
-                if x < self.level_width:
-                    self.current_tiles[y][x] = TileType.CASTLE
-        
-        # Castle entrance
-        self.current_tiles[self.level_height - 3][self.level_width - 4] = TileType.AIR
-        self.current_tiles[self.level_height - 4][self.level_width - 4] = TileType.AIR
 
     def generate_underground_level(self, world):
         """Generate underground level"""
         # Ceiling
-        for x in range(self.level_width):
-            self.current_tiles[0][x] = TileType.BRICK
-            self.current_tiles[1][x] = TileType.BRICK
+        self.current_tiles[:2, :] = TileType.BRICK
         
         # Floor - EXACT bottom placement
-        for x in range(self.level_width):
-            self.current_tiles[self.level_height - 1][x] = TileType.HARD
-            self.current_tiles[self.level_height - 2][x] = TileType.HARD
+        self.current_tiles[self.level_height - 2:, :] = TileType.HARD
         
         # Add platforms
-        for i in range(self.level_width // 20):
-            x = 15 + i * 20 + random.randint(0, 10)
-            y = 4 + random.randint(0, 6)
-            length = 3 + random.randint(0, 6)
-            for j in range(length):
-                if x + j < self.level_width and y < self.level_height:
-                    self.current_tiles[y][x + j] = TileType.QUESTION if random.random() < 0.25 else TileType.BRICK
+        count = self.level_width // 20
+        xs = 15 + np.arange(count) * 20 + self._rng.integers(0, 11, count)
+        ys = 4 + self._rng.integers(0, 7, count)
+        lengths = 3 + self._rng.integers(0, 7, count)
+        for x, y, length in zip(xs.tolist(), ys.tolist(), lengths.tolist()):
+            if y < self.level_height:
+                self.fill_blocks(y, x, length, 0.25)
         
         # Exit pipe
         self.add_pipe(self.level_width - 15, self.level_height - 6, 4)
@@ -953,132 +1460,211 @@ class UltraMario2D:
     def generate_castle_level(self, world):
         """Generate castle level"""
         # Floor with lava pits - EXACT placement
-        for x in range(self.level_width):
-            if x % 20 < 15 or x > self.level_width - 30:
-                self.current_tiles[self.level_height - 1][x] = TileType.HARD
-                self.current_tiles[self.level_height - 2][x] = TileType.HARD
-            else:
-                self.current_tiles[self.level_height - 1][x] = TileType.LAVA
+        columns = np.arange(self.level_width)
+        floor = (columns % 20 < 15) | (columns > self.level_width - 30)
+        self.current_tiles[self.level_height - 1] = np.where(floor, TileType.HARD, TileType.LAVA)
+        self.current_tiles[self.level_height - 2, floor] = TileType.HARD
         
         # Ceiling
-        for x in range(self.level_width):
-            self.current_tiles[0][x] = TileType.HARD
-            self.current_tiles[1][x] = TileType.HARD
+        self.current_tiles[:2, :] = TileType.HARD
         
         # Add platforms
-        for i in range(self.level_width // 25):
-            x = 10 + i * 25
-            y = 5 + random.randint(0, 4)
-            for j in range(4 + random.randint(0, 4)):
-                if x + j < self.level_width and y < self.level_height:
-                    self.current_tiles[y][x + j] = TileType.BRICK
+        count = self.level_width // 25
+        ys = 5 + self._rng.integers(0, 5, count)
+        lengths = 4 + self._rng.integers(0, 5, count)
+        for x, y, length in zip(range(10, 10 + count * 25, 25), ys.tolist(), lengths.tolist()):
+            if y < self.level_height:
+                self.current_tiles[y, x:x + length] = TileType.BRICK
         
         # Bridge at end
         bridge_start = self.level_width - 25
-        for x in range(bridge_start, self.level_width - 5):
-            if self.level_height - 4 >= 0:
-                self.current_tiles[self.level_height - 4][x] = TileType.BRIDGE
+        bridge_end = self.level_width - 5
+        self.current_tiles[self.level_height - 4, bridge_start:bridge_end] = TileType.BRIDGE
         
         # Lava under bridge
-        for x in range(bridge_start, self.level_width - 5):
-            self.current_tiles[self.level_height - 1][x] = TileType.LAVA
-            self.current_tiles[self.level_height - 2][x] = TileType.LAVA
-            self.current_tiles[self.level_height - 3][x] = TileType.LAVA
+        self.current_tiles[self.level_height - 3:, bridge_start:bridge_end] = TileType.LAVA
         
         # Axe position
         self.axe_x = self.level_width - 6
         self.axe_y = self.level_height - 5
         if self.axe_y >= 0:
-            self.current_tiles[self.axe_y][self.axe_x] = TileType.AXE
+            self.current_tiles[self.axe_y, self.axe_x] = TileType.AXE
         
         # Floor after bridge
-        for x in range(self.level_width - 5, self.level_width):
-            self.current_tiles[self.level_height - 1][x] = TileType.HARD
-            self.current_tiles[self.level_height - 2][x] = TileType.HARD
+        self.current_tiles[self.level_height - 2:, self.level_width - 5:] = TileType.HARD
         
         self.flag_pole_x = -1
 
     def generate_underwater_level(self, world):
         """Generate underwater level"""
         # Sandy floor - EXACT placement with variation
-        for x in range(self.level_width):
-            floor_height = self.level_height - 2 - (random.randint(0, 1) if random.random() < 0.3 else 0)
-            for y in range(floor_height, self.level_height):
-                self.current_tiles[y][x] = TileType.GROUND
+        raised = (self._rng.random(self.level_width) < 0.3) & (self._rng.integers(0, 2, self.level_width) == 1)
+        floor_height = self.level_height - 2 - raised
+        rows = np.arange(self.level_height)[:, None]
+        self.current_tiles[rows >= floor_height] = TileType.GROUND
         
         # Add coral
-        for i in range(self.level_width // 10):
-            x = 5 + i * 10 + random.randint(0, 5)
-            height = 1 + random.randint(0, 3)
-            for y in range(self.level_height - 3, max(self.level_height - 3 - height, 0), -1):
-                if x < self.level_width:
-                    self.current_tiles[y][x] = TileType.CORAL
+        count = self.level_width // 10
+        xs = 5 + np.arange(count) * 10 + self._rng.integers(0, 6, count)
+        heights = 1 + self._rng.integers(0, 4, count)
+        for x, height in zip(xs.tolist(), heights.tolist()):
+            if x < self.level_width:
+                top = max(self.level_height - 3 - height, 0) + 1
+                self.current_tiles[top:self.level_height - 2, x] = TileType.CORAL
         
         # Underwater platforms
-        for i in range(self.level_width // 20):
-            x = 15 + i * 20 + random.randint(0, 10)
-            y = 4 + random.randint(0, 6)
-            length = 3 + random.randint(0, 4)
-            for j in range(length):
-                if x + j < self.level_width and y < self.level_height:
-                    self.current_tiles[y][x + j] = TileType.HARD
+        count = self.level_width // 20
+        xs = 15 + np.arange(count) * 20 + self._rng.integers(0, 11, count)
+        ys = 4 + self._rng.integers(0, 7, count)
+        lengths = 3 + self._rng.integers(0, 5, count)
+        for x, y, length in zip(xs.tolist(), ys.tolist(), lengths.tolist()):
+            if y < self.level_height:
+                self.current_tiles[y, x:x + length] = TileType.HARD
         
         # Exit pipe
         self.add_pipe(self.level_width - 12, self.level_height - 6, 4)
         
         self.flag_pole_x = self.level_width - 6
 
+    def generation_seed(self):
+        """Seed for the compiled generators, which keep their own random state"""
+        return int(self._rng.integers(0, 2 ** 31))
+
     def add_pipe(self, x, y, height):
         """Add a pipe to the level"""
-        if x < 0 or x + 1 >= self.level_width or y < 0 or y + height >= self.level_height:
-            return
-        
-        # Top of pipe
-        self.current_tiles[y][x] = TileType.PIPE_TL
-        self.current_tiles[y][x + 1] = TileType.PIPE_TR
-        
-        # Body of pipe
-        for h in range(1, height):
-            if y + h < self.level_height:
-                self.current_tiles[y + h][x] = TileType.PIPE_BL
-                self.current_tiles[y + h][x + 1] = TileType.PIPE_BR
+        _add_pipe(self.current_tiles, x, y, height)
+
+    def fill_blocks(self, y, x, length, question_chance):
+        """Fill a row of blocks, each a question block with the given chance"""
+        length = max(min(length, self.level_width - x), 0)
+        is_question = self._rng.random(length) < question_chance
+        self.current_tiles[y, x:x + length] = np.where(is_question, TileType.QUESTION, TileType.BRICK)
 
     def populate_enemies(self, world, level):
         """Populate level with enemies"""
         enemy_count = 5 + world * 2 + level
-        
-        for i in range(enemy_count):
-            x = 100 + i * (self.level_width * SCALED_TILE // enemy_count)
-            # Place enemies on ground (row 9)
-            y = (self.level_height - 3) * SCALED_TILE
-            
-            # Skip enemies near start and end
-            if x < 200 or x > (self.level_width - 15) * SCALED_TILE:
-                continue
-            
-            # Vary enemy types
-            enemy_type = "goomba" if random.random() < 0.67 else "koopa"
-            
-            enemy = Entity(enemy_type, x, y)
-            enemy.vel_x = -1 if random.random() < 0.5 else 1
-            self.entities.append(enemy)
+        xs, ys, types, vel_xs = _place_enemies(self.level_width, self.level_height,
+                                               enemy_count, self.generation_seed())
+        for x, y, enemy_type, vel_x in zip(xs.tolist(), ys.tolist(), types.tolist(), vel_xs.tolist()):
+            enemy = self.spawn_entity(EntityType(enemy_type), x, y)
+            enemy.vel_x = vel_x
         
         # Add Bowser in castle levels
         if self.is_castle:
-            bowser = Entity("bowser", (self.level_width - 20) * SCALED_TILE, (self.level_height - 6) * SCALED_TILE)
+            bowser = self.spawn_entity(EntityType.BOWSER,
+                                       (self.level_width - 20) * SCALED_TILE,
+                                       (self.level_height - 6) * SCALED_TILE)
             bowser.vel_x = -1
-            self.entities.append(bowser)
 
-    def is_solid_tile(self, tx, ty):
-        """Check if a tile is solid"""
-        if tx < 0 or tx >= self.level_width or ty < 0 or ty >= self.level_height:
-            return False
-        
-        tile = self.current_tiles[ty][tx]
-        return tile in [TileType.GROUND, TileType.BRICK, TileType.QUESTION, 
-                       TileType.USED, TileType.HARD, TileType.PIPE_TL,
-                       TileType.PIPE_TR, TileType.PIPE_BL, TileType.PIPE_BR,
-                       TileType.BRIDGE, TileType.CASTLE]
+    def build_tile_atlas(self):
+        """Rasterize every tile variant once into two atlas surfaces
+        
+        Tiles covering their whole cell go in an opaque atlas that blits as
+        a plain copy; the rest go in a colorkeyed one. Static tiles get one
+        entry per TileTheme in theme_tile_rects, animated tiles one entry
+        per phase in anim_tile_rects, keyed (tile_type, phase). Phases are
+        the lava bubble flag and the water wave offset from draw_tile.
+        """
+        variants = []
+        for theme in TileTheme:
+            for tile_type in TileType:
+                if tile_type not in (TileType.AIR, TileType.LAVA, TileType.WATER):
+                    variants.append((theme, tile_type, 0))
+        variants += [(None, TileType.LAVA, phase) for phase in (False, True)]
+        variants += [(None, TileType.WATER, phase) for phase in range(-2, 3)]
+        
+        # Draw each variant on its own cell, skipping ones with no art
+        cells = {True: [], False: []}
+        for theme, tile_type, phase in variants:
+            cell = keyed_surface(SCALED_TILE, SCALED_TILE)
+            self.draw_tile(cell, tile_type, 0, 0, theme, phase)
+            covered = pygame.mask.from_surface(cell).count()
+            if covered:
+                cells[covered == SCALED_TILE * SCALED_TILE].append(((theme, tile_type, phase), cell))
+        
+        self.theme_tile_rects = [{} for _ in TileTheme]
+        self.anim_tile_rects = {}
+        for opaque, entries in cells.items():
+            width = SCALED_TILE * max(len(entries), 1)
+            if opaque:
+                atlas = pygame.Surface((width, SCALED_TILE)).convert()
+            else:
+                atlas = keyed_surface(width, SCALED_TILE)
+            for i, ((theme, tile_type, phase), cell) in enumerate(entries):
+                area = pygame.Rect(i * SCALED_TILE, 0, SCALED_TILE, SCALED_TILE)
+                atlas.blit(cell, area)
+                if theme is None:
+                    self.anim_tile_rects[tile_type, phase] = (atlas, area)
+                else:
+                    self.theme_tile_rects[theme][tile_type] = (atlas, area)
+            if opaque:
+                self.tile_atlas = atlas
+            else:
+                self.tile_atlas_keyed = atlas
+
+    def tile_blit(self, tile_type, x, y):
+        """(atlas, dest, area) blit arguments for a tile at x, y, or None
+        
+        Animated tiles pick their phase from x and anim_timer.
+        """
+        if tile_type == LAVA_TILE:
+            source = self.anim_tile_rects[LAVA_TILE, (self.anim_timer + x // 10) % 20 < 10]
+        elif tile_type == WATER_TILE:
+            phase = int((x + self.anim_timer * 2) * (0.1 * SINE_SCALE)) & SINE_MASK
+            source = self.anim_tile_rects[WATER_TILE, int(SINE_TABLE[phase] * 2)]
+        else:
+            source = self.tile_src_rects.get(tile_type)
+            if source is None:
+                return None
+        atlas, area = source
+        return atlas, (x, y), area
+
+    def build_tile_layer(self):
+        """Pre-render every tile of the level into one surface"""
+        if self.is_underground:
+            theme = TileTheme.UNDERGROUND
+        elif self.is_castle:
+            theme = TileTheme.CASTLE
+        else:
+            theme = TileTheme.OVERWORLD
+        self.tile_src_rects = self.theme_tile_rects[theme]
+        self.bg_surface = keyed_surface(self.level_width * SCALED_TILE, WINDOW_HEIGHT)
+        rows, cols = np.nonzero(self.current_tiles)
+        ops = [self.tile_blit(tile, tx * SCALED_TILE, ty * SCALED_TILE)
+               for ty, tx, tile in zip(rows.tolist(), cols.tolist(), self.current_tiles[rows, cols].tolist())]
+        self.bg_surface.blits([op for op in ops if op is not None], doreturn=False)
+        if self.flag_pole_x >= 0:
+            self.draw_flag_pole()
+        self._full_redraw = True
+
+    def draw_flag_pole(self):
+        """Draw the static flag pole and ball into the tile layer"""
+        x = self.flag_pole_x * SCALED_TILE
+        
+        # Flag pole
+        pygame.draw.rect(self.bg_surface, (0, 100, 0),
+                         (x + 12, SCALED_TILE * 3, 8, SCALED_TILE * (self.level_height - 6)))
+        
+        # Flag ball
+        pygame.draw.circle(self.bg_surface, (0, 180, 0), (x + 16, SCALED_TILE * 3 - 4), 8)
+
+    def redraw_tile(self, tx, ty):
+        """Refresh one changed tile in the pre-rendered layer"""
+        x = tx * SCALED_TILE
+        y = ty * SCALED_TILE
+        self.bg_surface.fill(COLOR_KEY, (x, y, SCALED_TILE, SCALED_TILE))
+        op = self.tile_blit(self.tile_view[ty, tx], x, y)
+        if op is not None:
+            self.bg_surface.blit(*op)
+        if tx == self.flag_pole_x:
+            self.draw_flag_pole()
+        self._dirty.append(pygame.Rect(x - int(self.camera_x), y, SCALED_TILE, SCALED_TILE))
+
+    def solid_batch(self, tx, ty):
+        """Solid flags for integer arrays of tile coordinates, out of bounds is empty"""
+        height, width = self.current_tiles.shape
+        inside = (tx >= 0) & (tx < width) & (ty >= 0) & (ty < height)
+        return SOLID_LUT[self.current_tiles[np.clip(ty, 0, height - 1), np.clip(tx, 0, width - 1)]] & inside
 
     def render(self):
         """Main render function"""
@@ -1092,6 +1678,9 @@ class UltraMario2D:
         else:
             self.screen.fill(SKY_BLUE)
         
+        # Blink phase shared by the "press ENTER" prompts
+        self.prompt_visible = (self.anim_timer // 30) % 2 == 0
+        
         # Render based on game state
         if self.game_state == GameState.TITLE:
             self.render_title()
@@ -1110,7 +1699,19 @@ class UltraMario2D:
         elif self.game_state == GameState.VICTORY:
             self.render_victory()
         
-        pygame.display.flip()
+        # A scrolled camera (including the parallax layers), new scene or new
+        # level invalidates the whole screen; otherwise upload only what was
+        # drawn this frame and last frame (to erase sprites that moved away)
+        view = (self.game_state, int(self.camera_x), int(self.camera_x * 0.3),
+                int(self.camera_x * 0.5), int(self.camera_x * 0.7))
+        if self._full_redraw or view != self._last_view or self.game_state == GameState.VICTORY:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self._prev_dirty + self._dirty)
+        self._full_redraw = False
+        self._last_view = view
+        self._prev_dirty, self._dirty = self._dirty, self._prev_dirty
+        self._dirty.clear()
 
     def render_title(self):
         """Render title screen"""
@@ -1118,32 +1719,32 @@ class UltraMario2D:
         for i in range(4):
             x = 50 + i * 150
             y = 40 + (i % 2) * 20
-            self.draw_cloud(x, y)
+            self.draw_cloud(self.screen, x, y)
         
         # Draw ground
         pygame.draw.rect(self.screen, GROUND_BROWN, (0, WINDOW_HEIGHT - 50, WINDOW_WIDTH, 50))
         
         # Title
-        title = self.font_large.render("ULTRA MARIO 2D BROS", True, WHITE)
-        title_rect = title.get_rect(center=(WINDOW_WIDTH // 2, 100))
+        title, (x, y) = self.centered_text("ULTRA MARIO 2D BROS", self.font_large, WHITE,
+                                           (WINDOW_WIDTH // 2, 100))
         # Shadow
-        shadow = self.font_large.render("ULTRA MARIO 2D BROS", True, BLACK)
-        self.screen.blit(shadow, (title_rect.x + 2, title_rect.y + 2))
-        self.screen.blit(title, title_rect)
+        shadow = self.render_text("ULTRA MARIO 2D BROS", self.font_large, BLACK)
+        self.screen.blit(shadow, (x + 2, y + 2))
+        self.screen.blit(title, (x, y))
         
         # Subtitle
-        subtitle = self.font_medium.render("Python Port by Catsan", True, COIN_YELLOW)
-        subtitle_rect = subtitle.get_rect(center=(WINDOW_WIDTH // 2, 140))
-        self.screen.blit(subtitle, subtitle_rect)
+        self.screen.blit(*self.centered_text("Python Port by Catsan", self.font_medium, COIN_YELLOW,
+                                             (WINDOW_WIDTH // 2, 140)))
         
         # Draw Mario
-        self.draw_mario(WINDOW_WIDTH // 2 - SCALED_TILE // 2, 180, True, PowerState.BIG, (self.anim_timer // 8) % 3)
+        self._dirty.append(self.draw_mario(WINDOW_WIDTH // 2 - SCALED_TILE // 2, 180, True,
+                                           PowerState.BIG, (self.anim_timer // 8) % 3))
         
         # Press Enter text (blinking)
-        if (self.anim_timer // 30) % 2 == 0:
-            text = self.font_medium.render("PRESS ENTER TO START", True, WHITE)
-            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, 300))
-            self.screen.blit(text, text_rect)
+        if self.prompt_visible:
+            text, position = self.centered_text("PRESS ENTER TO START", self.font_medium, WHITE,
+                                                (WINDOW_WIDTH // 2, 300))
+            self._dirty.append(self.screen.blit(text, position))
         
         # Controls
         controls = [
@@ -1155,7 +1756,7 @@ class UltraMario2D:
         ]
         y = WINDOW_HEIGHT - 100
         for control in controls:
-            text = self.font_small.render(control, True, WHITE)
+            text = self.render_text(control, self.font_small, WHITE)
             self.screen.blit(text, (20, y))
             y += 15
 
@@ -1172,93 +1773,104 @@ class UltraMario2D:
         self.render_entities()
         
         # Draw particles
-        for particle in self.particles:
-            pygame.draw.rect(self.screen, particle.color, 
-                           (int(particle.x - self.camera_x), int(particle.y), 8, 8))
+        dirty = self._dirty
+        screen = self.screen
+        camera_x = self.camera_x
+        count = self.particle_count
+        xs = (self.particle_xy[:count, 0] - camera_x).astype(np.int32).tolist()
+        ys = self.particle_xy[:count, 1].astype(np.int32).tolist()
+        draw_rect = pygame.draw.rect
+        for x, y, color in zip(xs, ys, self.particle_color[:count].tolist()):
+            dirty.append(draw_rect(screen, color, (x, y, 8, 8)))
         
         # Draw floating texts
+        font = self.font_small
         for text in self.floating_texts:
-            rendered_text = self.font_small.render(text.text, True, WHITE)
-            self.screen.blit(rendered_text, (int(text.x - self.camera_x), int(text.y)))
+            rendered_text = self.render_text(text.text, font, WHITE)
+            dirty.append(screen.blit(rendered_text, (int(text.x - camera_x), int(text.y))))
         
         # Draw player
         if not self.player_dead or self.death_timer < 60:
             visible = self.invincibility_frames == 0 or (self.invincibility_frames // 4) % 2 == 0
             if visible:
                 star_flash = self.star_timer > 0 and (self.star_timer // 4) % 2 == 0
-                self.draw_mario(int(self.player_x - self.camera_x), int(self.player_y),
-                               self.player_facing_right, self.player_power, self.anim_frame, star_flash)
+                dirty.append(self.draw_mario(int(self.player_x - self.camera_x), int(self.player_y),
+                                             self.player_facing_right, self.player_power,
+                                             self.anim_frame, star_flash))
+        
+        # Draw HUD, uploading its band only when a counter or the power
+        # indicator changed (a scroll uploads the whole screen anyway)
+        if self.render_hud():
+            dirty.append(pygame.Rect(0, 0, WINDOW_WIDTH, HUD_HEIGHT))
+
+    def build_parallax_layers(self):
+        """Prerender one repeating strip per background decoration layer
+        
+        Returns [(strip, screen_y, scroll_factor)]. Each strip is one period
+        of its layer, so tiling it across the screen reproduces the layer.
+        """
+        # Clouds: every 200px at three heights (30/50/70), so the pattern
+        # repeats every 600px; the strip starts at y=20
+        clouds = keyed_surface(600, 76, rle=True)
+        for i in range(3):
+            self.draw_cloud(clouds, i * 200, 10 + i * 20)
+        
+        # Hills: every 250px
+        hills = keyed_surface(250, 61, rle=True)
+        self.draw_hill(hills, 0, 0)
+        
+        # Bushes: every 180px, starting 80px in
+        bushes = keyed_surface(180, 26, rle=True)
+        self.draw_bush(bushes, 80, 5)
         
-        # Draw HUD
-        self.render_hud()
+        return [(clouds, 20, 0.3), (hills, WINDOW_HEIGHT - 100, 0.5), (bushes, WINDOW_HEIGHT - 75, 0.7)]
 
     def render_background_elements(self):
-        """Render background decorations"""
-        # Clouds (parallax)
-        for i in range(self.level_width // 10):
-            cloud_x = i * 200 - int(self.camera_x * 0.3)
-            if -100 < cloud_x < WINDOW_WIDTH + 100:
-                self.draw_cloud(cloud_x, 30 + (i % 3) * 20)
-        
-        # Hills
-        for i in range(self.level_width // 8):
-            hill_x = i * 250 - int(self.camera_x * 0.5)
-            if -150 < hill_x < WINDOW_WIDTH + 150:
-                self.draw_hill(hill_x, WINDOW_HEIGHT - 100)
-        
-        # Bushes
-        for i in range(self.level_width // 5):
-            bush_x = i * 180 + 80 - int(self.camera_x * 0.7)
-            if -50 < bush_x < WINDOW_WIDTH + 50:
-                self.draw_bush(bush_x, WINDOW_HEIGHT - 70)
-
-    def draw_cloud(self, x, y):
-        """Draw a cloud"""
-        pygame.draw.ellipse(self.screen, CLOUD_WHITE, (x, y, 40, 25))
-        pygame.draw.ellipse(self.screen, CLOUD_WHITE, (x + 20, y - 10, 40, 30))
-        pygame.draw.ellipse(self.screen, CLOUD_WHITE, (x + 50, y, 35, 25))
-
-    def draw_hill(self, x, y):
-        """Draw a hill"""
+        """Render background decorations by tiling the parallax strips"""
+        for layer, y, factor in self.parallax_layers:
+            width = layer.get_width()
+            scroll = int(self.camera_x * factor)
+            self.screen.blits([(layer, (x, y)) for x in range(-(scroll % width), WINDOW_WIDTH, width)],
+                              doreturn=False)
+
+    def draw_cloud(self, surface, x, y):
+        """Draw a cloud onto surface"""
+        pygame.draw.ellipse(surface, CLOUD_WHITE, (x, y, 40, 25))
+        pygame.draw.ellipse(surface, CLOUD_WHITE, (x + 20, y - 10, 40, 30))
+        pygame.draw.ellipse(surface, CLOUD_WHITE, (x + 50, y, 35, 25))
+
+    def draw_hill(self, surface, x, y):
+        """Draw a hill onto surface"""
         points = [(x, y + 60), (x + 75, y), (x + 150, y + 60)]
-        pygame.draw.polygon(self.screen, (0, 200, 0), points)
+        pygame.draw.polygon(surface, (0, 200, 0), points)
 
-    def draw_bush(self, x, y):
-        """Draw a bush"""
-        pygame.draw.ellipse(self.screen, (0, 180, 0), (x, y, 30, 20))
-        pygame.draw.ellipse(self.screen, (0, 180, 0), (x + 15, y - 5, 25, 25))
-        pygame.draw.ellipse(self.screen, (0, 180, 0), (x + 30, y, 30, 20))
+    def draw_bush(self, surface, x, y):
+        """Draw a bush onto surface"""
+        pygame.draw.ellipse(surface, (0, 180, 0), (x, y, 30, 20))
+        pygame.draw.ellipse(surface, (0, 180, 0), (x + 15, y - 5, 25, 25))
+        pygame.draw.ellipse(surface, (0, 180, 0), (x + 30, y, 30, 20))
 
     def render_tiles(self):
         """Render level tiles"""
-        start_tile_x = int(self.camera_x / SCALED_TILE)
-        end_tile_x = start_tile_x + WINDOW_WIDTH // SCALED_TILE + 2
-        
-        # CRITICAL: Render exactly to window height
-        for ty in range(self.level_height):  # 0 to 11
-            for tx in range(start_tile_x, min(end_tile_x, self.level_width)):
-                if tx < 0:
-                    continue
-                
-                tile = self.current_tiles[ty][tx]
-                screen_x = tx * SCALED_TILE - int(self.camera_x)
-                screen_y = ty * SCALED_TILE
-                
-                # Verify we don't render past window bounds
-                if screen_y < WINDOW_HEIGHT:
-                    self.draw_tile(tile, screen_x, screen_y)
-        
-        # Draw flag if present
+        cam = int(self.camera_x)
+        
+        # Static tiles: one blit of the visible window of the cached layer
+        self.screen.blit(self.bg_surface, (0, 0), pygame.Rect(cam, 0, WINDOW_WIDTH, WINDOW_HEIGHT))
+        
+        start_tile_x = max(0, cam // SCALED_TILE)
+        end_tile_x = min(self.level_width, start_tile_x + WINDOW_WIDTH // SCALED_TILE + 2)
+        
+        # Animated tiles are redrawn over the cached layer every frame; the
+        # visible ones are a contiguous run of the column-sorted list
+        first, last = np.searchsorted(self.anim_tile_columns, (start_tile_x, end_tile_x)).tolist()
+        tile_blit = self.tile_blit
+        ops = [tile_blit(tile, x - cam, y) for x, y, tile in self.anim_tiles[first:last]]
+        if ops:
+            self._dirty.extend(self.screen.blits(ops))
+        
+        # Draw flag if present; the pole itself is part of the tile layer
         if self.flag_pole_x >= 0:
-            screen_x = self.flag_pole_x * SCALED_TILE - int(self.camera_x)
-            
-            # Flag pole
-            pygame.draw.rect(self.screen, (0, 100, 0), 
-                           (screen_x + 12, SCALED_TILE * 3, 8, SCALED_TILE * (self.level_height - 6)))
-            
-            # Flag ball
-            pygame.draw.circle(self.screen, (0, 180, 0), 
-                             (screen_x + 16, SCALED_TILE * 3 - 4), 8)
+            screen_x = self.flag_pole_x * SCALED_TILE - cam
             
             # Flag
             flag_offset = self.flag_y if self.flag_descending else 0
@@ -1267,183 +1879,229 @@ class UltraMario2D:
                 (screen_x + 52, SCALED_TILE * 4 + flag_offset),
                 (screen_x + 20, SCALED_TILE * 5 + flag_offset)
             ]
-            pygame.draw.polygon(self.screen, WHITE, points)
-
-    def draw_tile(self, tile_type, x, y):
-        """Draw a single tile"""
+            self._dirty.append(pygame.draw.polygon(self.screen, WHITE, points))
+
+    def draw_tile(self, surface, tile_type, x, y, theme=TileTheme.OVERWORLD, phase=0):
+        """Draw a single tile onto surface
+        
+        Only build_tile_atlas calls this, once per tile variant; frames blit
+        the rasterized cells through tile_blit instead. phase selects the
+        animation frame of lava (bubble shown) and water (wave offset); see
+        tile_blit for how it follows anim_timer.
+        """
+        underground = theme == TileTheme.UNDERGROUND
+        castle = theme == TileTheme.CASTLE
         if tile_type == TileType.AIR:
             return
         elif tile_type == TileType.GROUND:
-            color = (100, 60, 20) if self.is_underground else GROUND_BROWN
-            pygame.draw.rect(self.screen, color, (x, y, SCALED_TILE, SCALED_TILE))
+            color = (100, 60, 20) if underground else GROUND_BROWN
+            pygame.draw.rect(surface, color, (x, y, SCALED_TILE, SCALED_TILE))
             # Texture
-            pygame.draw.rect(self.screen, (80, 40, 10) if self.is_underground else (180, 60, 10),
+            pygame.draw.rect(surface, (80, 40, 10) if underground else (180, 60, 10),
                            (x + 2, y + 2, SCALED_TILE - 4, SCALED_TILE - 4), 1)
         elif tile_type == TileType.BRICK:
-            color = (100, 100, 100) if self.is_castle else BRICK_RED
-            pygame.draw.rect(self.screen, color, (x, y, SCALED_TILE, SCALED_TILE))
+            color = (100, 100, 100) if castle else BRICK_RED
+            pygame.draw.rect(surface, color, (x, y, SCALED_TILE, SCALED_TILE))
             # Brick pattern
-            line_color = (60, 60, 60) if self.is_castle else (160, 60, 10)
-            pygame.draw.line(self.screen, line_color, (x, y + SCALED_TILE // 2), 
+            line_color = (60, 60, 60) if castle else (160, 60, 10)
+            pygame.draw.line(surface, line_color, (x, y + SCALED_TILE // 2), 
                            (x + SCALED_TILE, y + SCALED_TILE // 2))
-            pygame.draw.line(self.screen, line_color, (x + SCALED_TILE // 2, y), 
+            pygame.draw.line(surface, line_color, (x + SCALED_TILE // 2, y), 
                            (x + SCALED_TILE // 2, y + SCALED_TILE // 2))
         elif tile_type == TileType.QUESTION:
-            pygame.draw.rect(self.screen, QUESTION_YELLOW, (x, y, SCALED_TILE, SCALED_TILE))
-            pygame.draw.rect(self.screen, (200, 120, 40), (x + 1, y + 1, SCALED_TILE - 2, SCALED_TILE - 2), 1)
+            pygame.draw.rect(surface, QUESTION_YELLOW, (x, y, SCALED_TILE, SCALED_TILE))
+            pygame.draw.rect(surface, (200, 120, 40), (x + 1, y + 1, SCALED_TILE - 2, SCALED_TILE - 2), 1)
             # Question mark
-            text = self.font_medium.render("?", True, WHITE)
-            self.screen.blit(text, (x + 8, y + 4))
+            text = self.render_text("?", self.font_medium, WHITE)
+            surface.blit(text, (x + 8, y + 4))
         elif tile_type == TileType.USED:
-            pygame.draw.rect(self.screen, (100, 60, 20), (x, y, SCALED_TILE, SCALED_TILE))
-            pygame.draw.rect(self.screen, (60, 40, 10), (x + 2, y + 2, SCALED_TILE - 4, SCALED_TILE - 4), 1)
-        elif tile_type in [TileType.PIPE_TL, TileType.PIPE_TR, TileType.PIPE_BL, TileType.PIPE_BR]:
-            pygame.draw.rect(self.screen, PIPE_GREEN, (x, y, SCALED_TILE, SCALED_TILE))
+            pygame.draw.rect(surface, (100, 60, 20), (x, y, SCALED_TILE, SCALED_TILE))
+            pygame.draw.rect(surface, (60, 40, 10), (x + 2, y + 2, SCALED_TILE - 4, SCALED_TILE - 4), 1)
+        elif tile_type in PIPE_TILES:
+            pygame.draw.rect(surface, PIPE_GREEN, (x, y, SCALED_TILE, SCALED_TILE))
             # Pipe highlights
-            if tile_type in [TileType.PIPE_TL, TileType.PIPE_BL]:
-                pygame.draw.rect(self.screen, (0, 200, 0), (x, y, 4, SCALED_TILE))
-            if tile_type in [TileType.PIPE_TR, TileType.PIPE_BR]:
-                pygame.draw.rect(self.screen, (0, 200, 0), (x + SCALED_TILE - 4, y, 4, SCALED_TILE))
-            if tile_type in [TileType.PIPE_TL, TileType.PIPE_TR]:
-                pygame.draw.rect(self.screen, (0, 220, 0), (x, y, SCALED_TILE, 8))
+            if tile_type in PIPE_LEFT_TILES:
+                pygame.draw.rect(surface, (0, 200, 0), (x, y, 4, SCALED_TILE))
+            if tile_type in PIPE_RIGHT_TILES:
+                pygame.draw.rect(surface, (0, 200, 0), (x + SCALED_TILE - 4, y, 4, SCALED_TILE))
+            if tile_type in PIPE_TOP_TILES:
+                pygame.draw.rect(surface, (0, 220, 0), (x, y, SCALED_TILE, 8))
         elif tile_type == TileType.HARD:
-            pygame.draw.rect(self.screen, (80, 80, 80), (x, y, SCALED_TILE, SCALED_TILE))
-            pygame.draw.rect(self.screen, (120, 120, 120), (x + 2, y + 2, SCALED_TILE - 4, SCALED_TILE - 4), 1)
+            pygame.draw.rect(surface, (80, 80, 80), (x, y, SCALED_TILE, SCALED_TILE))
+            pygame.draw.rect(surface, (120, 120, 120), (x + 2, y + 2, SCALED_TILE - 4, SCALED_TILE - 4), 1)
         elif tile_type == TileType.CASTLE:
-            pygame.draw.rect(self.screen, CASTLE_GRAY, (x, y, SCALED_TILE, SCALED_TILE))
+            pygame.draw.rect(surface, CASTLE_GRAY, (x, y, SCALED_TILE, SCALED_TILE))
             # Castle pattern
-            pygame.draw.line(self.screen, (80, 80, 80), (x, y + SCALED_TILE // 2), 
+            pygame.draw.line(surface, (80, 80, 80), (x, y + SCALED_TILE // 2), 
                            (x + SCALED_TILE, y + SCALED_TILE // 2))
         elif tile_type == TileType.LAVA:
-            pygame.draw.rect(self.screen, LAVA_RED, (x, y, SCALED_TILE, SCALED_TILE))
-            pygame.draw.rect(self.screen, (255, 150, 50), (x, y, SCALED_TILE, 4))
+            pygame.draw.rect(surface, LAVA_RED, (x, y, SCALED_TILE, SCALED_TILE))
+            pygame.draw.rect(surface, (255, 150, 50), (x, y, SCALED_TILE, 4))
             # Animated bubbles
-            if (self.anim_timer + x // 10) % 20 < 10:
-                pygame.draw.circle(self.screen, (255, 200, 100), (x + 12, y + 8), 4)
+            if phase:
+                pygame.draw.circle(surface, (255, 200, 100), (x + 12, y + 8), 4)
         elif tile_type == TileType.BRIDGE:
-            pygame.draw.rect(self.screen, (160, 100, 60), (x, y + 4, SCALED_TILE, SCALED_TILE - 8))
+            pygame.draw.rect(surface, (160, 100, 60), (x, y + 4, SCALED_TILE, SCALED_TILE - 8))
             # Chain pattern
-            pygame.draw.line(self.screen, (100, 60, 30), (x, y + SCALED_TILE // 2), 
+            pygame.draw.line(surface, (100, 60, 30), (x, y + SCALED_TILE // 2), 
                            (x + SCALED_TILE, y + SCALED_TILE // 2))
         elif tile_type == TileType.AXE:
             # Handle
-            pygame.draw.rect(self.screen, (139, 69, 19), (x + 12, y + 8, 8, 24))
+            pygame.draw.rect(surface, (139, 69, 19), (x + 12, y + 8, 8, 24))
             # Blade
             points = [(x + 6, y + 8), (x + 20, y + 2), (x + 26, y + 12), (x + 20, y + 18)]
-            pygame.draw.polygon(self.screen, AXE_SILVER, points)
+            pygame.draw.polygon(surface, AXE_SILVER, points)
             # Glint
-            pygame.draw.line(self.screen, WHITE, (x + 10, y + 6), (x + 14, y + 10))
+            pygame.draw.line(surface, WHITE, (x + 10, y + 6), (x + 14, y + 10))
         elif tile_type == TileType.WATER:
-            pygame.draw.rect(self.screen, WATER_BLUE, (x, y, SCALED_TILE, SCALED_TILE))
+            pygame.draw.rect(surface, WATER_BLUE, (x, y, SCALED_TILE, SCALED_TILE))
             # Wave animation
-            wave_offset = int(math.sin((x + self.anim_timer * 2) * 0.1) * 2)
-            pygame.draw.line(self.screen, (100, 200, 255), (x, y + 4 + wave_offset), 
+            wave_offset = phase
+            pygame.draw.line(surface, (100, 200, 255), (x, y + 4 + wave_offset), 
                            (x + SCALED_TILE, y + 4 + wave_offset))
         elif tile_type == TileType.CORAL:
             # Coral branches
-            pygame.draw.ellipse(self.screen, CORAL_PINK, (x + 2, y + 8, 12, 20))
-            pygame.draw.ellipse(self.screen, CORAL_PINK, (x + 10, y + 4, 14, 24))
-            pygame.draw.ellipse(self.screen, CORAL_PINK, (x + 20, y + 10, 10, 18))
+            pygame.draw.ellipse(surface, CORAL_PINK, (x + 2, y + 8, 12, 20))
+            pygame.draw.ellipse(surface, CORAL_PINK, (x + 10, y + 4, 14, 24))
+            pygame.draw.ellipse(surface, CORAL_PINK, (x + 20, y + 10, 10, 18))
+
+    def build_sprites(self):
+        """Rasterize entity art once into display-format sprites
+        
+        Returns {(entity_type, variant): (surface, (offset_x, offset_y))};
+        the offset is added to the entity position when blitting.
+        """
+        sprites = {}
+        
+        # The art has no partial transparency, so a colorkey replaces
+        # per-pixel alpha blending; RLE skips the transparent runs
+        def sprite(key, height=SCALED_TILE, offset_y=0):
+            surface = keyed_surface(SCALED_TILE, height, rle=True)
+            sprites[key] = (surface, (0, offset_y))
+            return surface
+        
+        # Goomba: walking frames 0/1, flattened 2
+        for frame in range(2):
+            surface = sprite((EntityType.GOOMBA, frame))
+            # Body
+            pygame.draw.ellipse(surface, GOOMBA_BROWN, (0, 0, SCALED_TILE, SCALED_TILE - 4))
+            pygame.draw.rect(surface, GOOMBA_BROWN, (4, SCALED_TILE - 10, SCALED_TILE - 8, 10))
+            # Feet
+            foot_offset = 0 if frame == 0 else 2
+            pygame.draw.ellipse(surface, (100, 50, 30), (foot_offset, SCALED_TILE - 8, 10, 8))
+            pygame.draw.ellipse(surface, (100, 50, 30), (SCALED_TILE - 10 - foot_offset, SCALED_TILE - 8, 10, 8))
+            # Eyes
+            pygame.draw.ellipse(surface, WHITE, (6, 8, 8, 8))
+            pygame.draw.ellipse(surface, WHITE, (SCALED_TILE - 14, 8, 8, 8))
+            pygame.draw.ellipse(surface, BLACK, (8, 10, 4, 4))
+            pygame.draw.ellipse(surface, BLACK, (SCALED_TILE - 12, 10, 4, 4))
+        surface = sprite((EntityType.GOOMBA, 2))
+        pygame.draw.rect(surface, GOOMBA_BROWN, (0, SCALED_TILE - 8, SCALED_TILE, 8))
+        
+        # Koopa: walking 0 (head pokes 8px above the body), shell 1
+        surface = sprite((EntityType.KOOPA, 0), SCALED_TILE + 8, -8)
+        pygame.draw.ellipse(surface, KOOPA_GREEN, (4, 8, SCALED_TILE - 8, SCALED_TILE))
+        pygame.draw.ellipse(surface, (200, 180, 100), (8, 0, 16, 16))
+        surface = sprite((EntityType.KOOPA, 1))
+        pygame.draw.ellipse(surface, KOOPA_GREEN, (0, 8, SCALED_TILE, SCALED_TILE - 8))
+        pygame.draw.ellipse(surface, (0, 200, 0), (4, 12, SCALED_TILE - 8, SCALED_TILE - 16))
+        
+        # Mushroom
+        surface = sprite((EntityType.MUSHROOM, 0))
+        pygame.draw.ellipse(surface, MARIO_RED, (0, 0, SCALED_TILE, SCALED_TILE // 2 + 4))
+        pygame.draw.circle(surface, WHITE, (8, 8), 4)
+        pygame.draw.circle(surface, WHITE, (SCALED_TILE - 8, 8), 4)
+        pygame.draw.rect(surface, (255, 220, 180), (6, SCALED_TILE // 2, SCALED_TILE - 12, SCALED_TILE // 2))
+        
+        # Fire flower
+        surface = sprite((EntityType.FIREFLOWER, 0))
+        pygame.draw.rect(surface, (0, 180, 0), (12, 16, 8, 16))
+        pygame.draw.ellipse(surface, FIRE_ORANGE, (4, 0, 12, 12))
+        pygame.draw.ellipse(surface, FIRE_ORANGE, (16, 0, 12, 12))
+        pygame.draw.ellipse(surface, FIRE_ORANGE, (4, 8, 12, 12))
+        pygame.draw.ellipse(surface, FIRE_ORANGE, (16, 8, 12, 12))
+        pygame.draw.ellipse(surface, QUESTION_YELLOW, (10, 6, 12, 12))
+        
+        # Star: two flashing colors
+        for frame, color in enumerate((STAR_YELLOW, WHITE)):
+            surface = sprite((EntityType.STAR, frame))
+            self.draw_star(surface, SCALED_TILE // 2, SCALED_TILE // 2, 14, color)
+        
+        # Coin: one sprite per spin width
+        for coin_width in range(8, 17):
+            surface = sprite((EntityType.COIN, coin_width))
+            x_offset = (SCALED_TILE - coin_width) // 2
+            pygame.draw.ellipse(surface, COIN_YELLOW, (x_offset, 0, coin_width, SCALED_TILE))
+            pygame.draw.ellipse(surface, (200, 150, 50),
+                                (x_offset + 2, 4, coin_width - 4, SCALED_TILE - 8), 1)
+        return sprites
 
     def render_entities(self):
-        """Render all entities"""
-        for entity in self.entities:
-            screen_x = int(entity.x - self.camera_x)
-            screen_y = int(entity.y)
-            
-            if screen_x < -50 or screen_x > WINDOW_WIDTH + 50:
-                continue
-            
-            if entity.type == "goomba":
-                if entity.stomped:
-                    # Flat goomba
-                    pygame.draw.rect(self.screen, GOOMBA_BROWN, 
-                                   (screen_x, screen_y + SCALED_TILE - 8, SCALED_TILE, 8))
-                else:
-                    # Body
-                    pygame.draw.ellipse(self.screen, GOOMBA_BROWN, 
-                                      (screen_x, screen_y, SCALED_TILE, SCALED_TILE - 4))
-                    pygame.draw.rect(self.screen, GOOMBA_BROWN,
-                                    (screen_x + 4, screen_y + SCALED_TILE - 10, SCALED_TILE - 8, 10))
-                    # Feet
-                    foot_offset = 0 if self.anim_frame % 2 == 0 else 2
-                    pygame.draw.ellipse(self.screen, (100, 50, 30),
-                                      (screen_x + foot_offset, screen_y + SCALED_TILE - 8, 10, 8))
-                    pygame.draw.ellipse(self.screen, (100, 50, 30),
-                                      (screen_x + SCALED_TILE - 10 - foot_offset, screen_y + SCALED_TILE - 8, 10, 8))
-                    # Eyes
-                    pygame.draw.ellipse(self.screen, WHITE, (screen_x + 6, screen_y + 8, 8, 8))
-                    pygame.draw.ellipse(self.screen, WHITE, (screen_x + SCALED_TILE - 14, screen_y + 8, 8, 8))
-                    pygame.draw.ellipse(self.screen, BLACK, (screen_x + 8, screen_y + 10, 4, 4))
-                    pygame.draw.ellipse(self.screen, BLACK, (screen_x + SCALED_TILE - 12, screen_y + 10, 4, 4))
-            
-            elif entity.type == "koopa":
-                if entity.in_shell:
-                    # Shell
-                    pygame.draw.ellipse(self.screen, KOOPA_GREEN,
-                                      (screen_x, screen_y + 8, SCALED_TILE, SCALED_TILE - 8))
-                    pygame.draw.ellipse(self.screen, (0, 200, 0),
-                                      (screen_x + 4, screen_y + 12, SCALED_TILE - 8, SCALED_TILE - 16))
-                else:
-                    # Walking koopa
-                    pygame.draw.ellipse(self.screen, KOOPA_GREEN,
-                                      (screen_x + 4, screen_y, SCALED_TILE - 8, SCALED_TILE))
-                    # Head
-                    pygame.draw.ellipse(self.screen, (200, 180, 100),
-                                      (screen_x + 8, screen_y - 8, 16, 16))
-            
-            elif entity.type == "mushroom":
-                # Cap
-                pygame.draw.ellipse(self.screen, MARIO_RED,
-                                  (screen_x, screen_y, SCALED_TILE, SCALED_TILE // 2 + 4))
-                # Spots
-                pygame.draw.circle(self.screen, WHITE, (screen_x + 8, screen_y + 8), 4)
-                pygame.draw.circle(self.screen, WHITE, (screen_x + SCALED_TILE - 8, screen_y + 8), 4)
-                # Stem
-                pygame.draw.rect(self.screen, (255, 220, 180),
-                               (screen_x + 6, screen_y + SCALED_TILE // 2, SCALED_TILE - 12, SCALED_TILE // 2))
-            
-            elif entity.type == "fireflower":
-                # Stem
-                pygame.draw.rect(self.screen, (0, 180, 0),
-                               (screen_x + 12, screen_y + 16, 8, 16))
-                # Petals
-                pygame.draw.ellipse(self.screen, FIRE_ORANGE, (screen_x + 4, screen_y, 12, 12))
-                pygame.draw.ellipse(self.screen, FIRE_ORANGE, (screen_x + 16, screen_y, 12, 12))
-                pygame.draw.ellipse(self.screen, FIRE_ORANGE, (screen_x + 4, screen_y + 8, 12, 12))
-                pygame.draw.ellipse(self.screen, FIRE_ORANGE, (screen_x + 16, screen_y + 8, 12, 12))
-                # Center
-                pygame.draw.ellipse(self.screen, QUESTION_YELLOW, (screen_x + 10, screen_y + 6, 12, 12))
-            
-            elif entity.type == "star":
-                # Star power-up
-                color = STAR_YELLOW if self.anim_frame % 2 == 0 else WHITE
-                self.draw_star(screen_x + SCALED_TILE // 2, screen_y + SCALED_TILE // 2, 14, color)
-            
-            elif entity.type == "coin":
-                # Animated coin
-                coin_width = 8 + int(abs(math.sin(self.anim_timer * 0.2)) * 8)
-                x_offset = (SCALED_TILE - coin_width) // 2
-                pygame.draw.ellipse(self.screen, COIN_YELLOW,
-                                  (screen_x + x_offset, screen_y, coin_width, SCALED_TILE))
-                pygame.draw.ellipse(self.screen, (200, 150, 50),
-                                  (screen_x + x_offset + 2, screen_y + 4, coin_width - 4, SCALED_TILE - 8), 1)
-
-    def draw_star(self, cx, cy, size, color):
-        """Draw a star shape"""
+        """Render all entities with one batched blit
+        
+        Culling and sprite variant selection run over the entity pool
+        arrays; only visible entities are visited in Python, in pool order.
+        """
+        pool = self.entity_pool
+        count = pool.count
+        screen_x = (pool.x[:count].astype(np.float64) - self.camera_x).astype(np.int32)
+        visible = np.flatnonzero((screen_x >= -50) & (screen_x <= WINDOW_WIDTH + 50))
+        if len(visible) == 0:
+            return
+        
+        types = pool.type[visible]
+        variant = np.zeros(len(visible), dtype=np.int32)
+        goomba = types == GOOMBA_ENTITY
+        variant[goomba] = np.where(pool.stomped[visible][goomba], 2, self.anim_frame % 2)
+        koopa = types == KOOPA_ENTITY
+        variant[koopa] = pool.in_shell[visible][koopa]
+        variant[types == STAR_ENTITY] = self.anim_frame % 2
+        spin = SINE_TABLE[int(self.anim_timer * (0.2 * SINE_SCALE)) & SINE_MASK]
+        variant[types == COIN_ENTITY] = 8 + int(abs(spin) * 8)
+        
+        ops = []
+        sprites = self.sprites
+        for x, y, entity_type, frame in zip(screen_x[visible].tolist(),
+                                            pool.y[visible].astype(np.int32).tolist(),
+                                            types.tolist(), variant.tolist()):
+            sprite = sprites.get((entity_type, frame))
+            if sprite is not None:
+                surface, (offset_x, offset_y) = sprite
+                ops.append((surface, (x + offset_x, y + offset_y)))
+        if ops:
+            self._dirty.extend(self.screen.blits(ops))
+
+    def draw_star(self, surface, cx, cy, size, color):
+        """Draw a star shape onto surface"""
         points = []
-        for i in range(10):
-            angle = math.pi / 2 + i * math.pi / 5
+        for i, (dx, dy) in enumerate(STAR_DIRS):
             r = size if i % 2 == 0 else size // 2
-            x = cx + int(math.cos(angle) * r)
-            y = cy - int(math.sin(angle) * r)
-            points.append((x, y))
-        pygame.draw.polygon(self.screen, color, points)
+            points.append((cx + int(dx * r), cy - int(dy * r)))
+        pygame.draw.polygon(surface, color, points)
+
+    def build_mario_sprites(self):
+        """Rasterize every Mario pose once into display-format sprites
+        
+        Returns {(power, facing_right, frame, star_flash): surface}, small
+        Mario one tile high and the rest two.
+        """
+        sprites = {}
+        for power in PowerState:
+            height = SCALED_TILE if power == PowerState.SMALL else SCALED_TILE * 2
+            for facing_right in (False, True):
+                for frame in range(3):
+                    for star_flash in (False, True):
+                        surface = keyed_surface(SCALED_TILE, height, rle=True)
+                        self.paint_mario(surface, 0, 0, facing_right, power, frame, star_flash)
+                        sprites[power, facing_right, frame, star_flash] = surface
+        return sprites
 
     def draw_mario(self, x, y, facing_right, power, frame, star_flash=False):
-        """Draw Mario sprite"""
-        height = SCALED_TILE if power == PowerState.SMALL else SCALED_TILE * 2
-        
+        """Blit the prerendered Mario pose, returns the screen rect it covers"""
+        return self.screen.blit(self.mario_sprites[power, facing_right, frame, star_flash], (x, y))
+
+    def paint_mario(self, surface, x, y, facing_right, power, frame, star_flash):
+        """Draw a Mario pose onto surface with its top-left at x, y"""
         # Colors
         hat_color = WHITE if star_flash else MARIO_RED
         skin_color = STAR_YELLOW if star_flash else MARIO_SKIN
@@ -1452,190 +2110,220 @@ class UltraMario2D:
         if power == PowerState.SMALL:
             # Small Mario
             # Hat
-            pygame.draw.rect(self.screen, hat_color, (x + 4, y, 24, 8))
-            pygame.draw.rect(self.screen, hat_color, (x + 2, y + 4, 28, 6))
+            pygame.draw.rect(surface, hat_color, (x + 4, y, 24, 8))
+            pygame.draw.rect(surface, hat_color, (x + 2, y + 4, 28, 6))
             
             # Face
-            pygame.draw.rect(self.screen, skin_color, (x + 4, y + 10, 24, 10))
+            pygame.draw.rect(surface, skin_color, (x + 4, y + 10, 24, 10))
             
             # Eyes
             eye_offset = 18 if facing_right else 6
-            pygame.draw.rect(self.screen, BLACK, (x + eye_offset, y + 12, 4, 4))
+            pygame.draw.rect(surface, BLACK, (x + eye_offset, y + 12, 4, 4))
             
             # Body
-            pygame.draw.rect(self.screen, overall_color, (x + 6, y + 20, 20, 12))
+            pygame.draw.rect(surface, overall_color, (x + 6, y + 20, 20, 12))
         else:
             # Big/Fire Mario
             # Hat
-            pygame.draw.rect(self.screen, hat_color, (x + 4, y, 24, 10))
-            pygame.draw.rect(self.screen, hat_color, (x + 2, y + 6, 28, 8))
+            pygame.draw.rect(surface, hat_color, (x + 4, y, 24, 10))
+            pygame.draw.rect(surface, hat_color, (x + 2, y + 6, 28, 8))
             
             # Face
-            pygame.draw.rect(self.screen, skin_color, (x + 4, y + 14, 24, 14))
+            pygame.draw.rect(surface, skin_color, (x + 4, y + 14, 24, 14))
             
             # Eyes
             eye_offset = 18 if facing_right else 6
-            pygame.draw.rect(self.screen, BLACK, (x + eye_offset, y + 18, 5, 5))
+            pygame.draw.rect(surface, BLACK, (x + eye_offset, y + 18, 5, 5))
             
             # Mustache
-            pygame.draw.rect(self.screen, (80, 40, 20), (x + 6, y + 24, 20, 4))
+            pygame.draw.rect(surface, (80, 40, 20), (x + 6, y + 24, 20, 4))
             
             # Body
-            pygame.draw.rect(self.screen, overall_color, (x + 4, y + 28, 24, 20))
+            pygame.draw.rect(surface, overall_color, (x + 4, y + 28, 24, 20))
             
             # Buttons
-            pygame.draw.circle(self.screen, COIN_YELLOW, (x + 12, y + 34), 2)
-            pygame.draw.circle(self.screen, COIN_YELLOW, (x + 20, y + 34), 2)
+            pygame.draw.circle(surface, COIN_YELLOW, (x + 12, y + 34), 2)
+            pygame.draw.circle(surface, COIN_YELLOW, (x + 20, y + 34), 2)
             
             # Arms
-            if frame in [1, 2]:
-                pygame.draw.rect(self.screen, skin_color, (x, y + 32, 6, 10))
-                pygame.draw.rect(self.screen, skin_color, (x + 26, y + 32, 6, 10))
+            if frame in (1, 2):
+                pygame.draw.rect(surface, skin_color, (x, y + 32, 6, 10))
+                pygame.draw.rect(surface, skin_color, (x + 26, y + 32, 6, 10))
             else:
-                pygame.draw.rect(self.screen, skin_color, (x, y + 34, 6, 8))
-                pygame.draw.rect(self.screen, skin_color, (x + 26, y + 34, 6, 8))
+                pygame.draw.rect(surface, skin_color, (x, y + 34, 6, 8))
+                pygame.draw.rect(surface, skin_color, (x + 26, y + 34, 6, 8))
             
             # Legs
             leg_offset = -2 if frame == 1 else (2 if frame == 2 else 0)
-            pygame.draw.rect(self.screen, (100, 60, 40), (x + 6 + leg_offset, y + 48, 8, 16))
-            pygame.draw.rect(self.screen, (100, 60, 40), (x + 18 - leg_offset, y + 48, 8, 16))
+            pygame.draw.rect(surface, (100, 60, 40), (x + 6 + leg_offset, y + 48, 8, 16))
+            pygame.draw.rect(surface, (100, 60, 40), (x + 18 - leg_offset, y + 48, 8, 16))
+
+    def build_hud_labels(self):
+        """Prerender the HUD parts that never change, as (surface, dest) pairs
+        
+        The labels keep their own per-pixel alpha, since baking antialiased
+        text into one colorkeyed layer would fringe it with the key color.
+        Also sets coins_x and lives_x, where the digits after the "x" and
+        "LIVES: " prefixes start, and the star_indicator and fire_indicator
+        blits for the power indicator.
+        """
+        font = self.font_small
+        coin = keyed_surface(21, 21, rle=True)
+        pygame.draw.circle(coin, COIN_YELLOW, (10, 10), 10)
+        self.coins_x = 140 + font.size("x")[0]
+        self.lives_x = 420 + font.size("LIVES: ")[0]
+        self.star_indicator = (self.render_text("★ STAR!", font, STAR_YELLOW), (500, 11))
+        self.fire_indicator = (self.render_text("🔥 FIRE", font, FIRE_ORANGE), (500, 11))
+        return [(self.render_text("SCORE", font, WHITE), (20, 5)),
+                (coin, (118, 8)),
+                (self.render_text("x", font, WHITE), (140, 11)),
+                (self.render_text("WORLD", font, WHITE), (220, 5)),
+                (self.render_text("TIME", font, WHITE), (320, 5)),
+                (self.render_text("LIVES:", font, WHITE), (420, 11))]
 
     def render_hud(self):
-        """Render HUD elements"""
-        # Score
-        text = self.font_small.render("SCORE", True, WHITE)
-        self.screen.blit(text, (20, 5))
-        text = self.font_small.render(f"{self.score:06d}", True, WHITE)
-        self.screen.blit(text, (20, 20))
-        
-        # Coins
-        pygame.draw.circle(self.screen, COIN_YELLOW, (128, 18), 10)
-        text = self.font_small.render(f"x{self.coins:02d}", True, WHITE)
-        self.screen.blit(text, (140, 11))
+        """Render HUD elements, gathered into one batched blit
         
-        # World
-        text = self.font_small.render("WORLD", True, WHITE)
-        self.screen.blit(text, (220, 5))
-        text = self.font_small.render(f"{self.current_world}-{self.current_level}", True, WHITE)
-        self.screen.blit(text, (225, 20))
-        
-        # Time
-        text = self.font_small.render("TIME", True, WHITE)
-        self.screen.blit(text, (320, 5))
+        The blit list is only recomposed when something it shows changed,
+        which is reported by returning True.
+        """
+        if self.star_timer > 0:
+            indicator = self.star_indicator
+        elif self.player_power == PowerState.FIRE:
+            indicator = self.fire_indicator
+        else:
+            indicator = None
+        hud_state = (self.score, self.coins, self.time_remaining, self.lives, self.current_world,
+                     self.current_level, indicator)
+        if hud_state == self._hud_state:
+            self.fblits(self._hud_blits)
+            return False
+        self._hud_state = hud_state
+        
+        # Static labels and coin icon
+        blits = list(self.hud_labels)
+        
+        # Counters, composed from cached digit glyphs
+        font = self.font_small
+        blits += self.number_blits(self.score, 20, 20, font, WHITE, 6)
+        blits += self.number_blits(self.coins, self.coins_x, 11, font, WHITE, 2)
         color = MARIO_RED if self.time_remaining <= 100 else WHITE
-        text = self.font_small.render(str(self.time_remaining), True, color)
-        self.screen.blit(text, (320, 20))
+        blits += self.number_blits(self.time_remaining, 320, 20, font, color)
+        blits += self.number_blits(self.lives, self.lives_x, 11, font, WHITE)
         
-        # Lives
-        text = self.font_small.render(f"LIVES: {self.lives}", True, WHITE)
-        self.screen.blit(text, (420, 11))
+        # World
+        blits.append((self.render_text(f"{self.current_world}-{self.current_level}", font, WHITE), (225, 20)))
         
         # Power indicator
-        if self.star_timer > 0:
-            text = self.font_small.render("★ STAR!", True, STAR_YELLOW)
-            self.screen.blit(text, (500, 11))
-        elif self.player_power == PowerState.FIRE:
-            text = self.font_small.render("🔥 FIRE", True, FIRE_ORANGE)
-            self.screen.blit(text, (500, 11))
+        if indicator is not None:
+            blits.append(indicator)
+        
+        self._hud_blits = blits
+        self.fblits(blits)
+        return True
+
+    def build_overlay(self):
+        """Fullscreen black surface; callers set its alpha to pick how far it dims"""
+        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+        overlay.fill(BLACK)
+        return overlay
 
     def render_pause_overlay(self):
         """Render pause screen overlay"""
         # Semi-transparent overlay
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        overlay.set_alpha(150)
-        overlay.fill(BLACK)
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.overlay, (0, 0))
         
         # Paused text
-        text = self.font_large.render("PAUSED", True, WHITE)
-        text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
-        self.screen.blit(text, text_rect)
+        self.screen.blit(*self.centered_text("PAUSED", self.font_large, WHITE,
+                                             (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)))
         
-        text = self.font_medium.render("Press P to resume", True, WHITE)
-        text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 40))
-        self.screen.blit(text, text_rect)
+        self.screen.blit(*self.centered_text("Press P to resume", self.font_medium, WHITE,
+                                             (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 40)))
 
     def render_game_over(self):
         """Render game over screen"""
         self.screen.fill(BLACK)
         
-        text = self.font_large.render("GAME OVER", True, WHITE)
-        text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 30))
-        self.screen.blit(text, text_rect)
+        self.screen.blit(*self.centered_text("GAME OVER", self.font_large, WHITE,
+                                             (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 30)))
         
-        text = self.font_medium.render(f"Final Score: {self.score}", True, WHITE)
-        text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 20))
-        self.screen.blit(text, text_rect)
+        self.screen.blit(*self.centered_text(f"Final Score: {self.score}", self.font_medium, WHITE,
+                                             (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 20)))
         
-        if (self.anim_timer // 30) % 2 == 0:
-            text = self.font_small.render("Press ENTER to continue", True, WHITE)
-            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 60))
-            self.screen.blit(text, text_rect)
+        if self.prompt_visible:
+            text, position = self.centered_text("Press ENTER to continue", self.font_small, WHITE,
+                                                (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 60))
+            self._dirty.append(self.screen.blit(text, position))
 
     def render_level_complete(self):
         """Render level complete overlay"""
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        overlay.set_alpha(100)
-        overlay.fill(BLACK)
-        self.screen.blit(overlay, (0, 0))
+        # No transition enters this state, so it sets the shared overlay's alpha itself
+        self.overlay.set_alpha(100)
+        self.screen.blit(self.overlay, (0, 0))
         
-        text = self.font_large.render("LEVEL COMPLETE!", True, WHITE)
-        text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
-        self.screen.blit(text, text_rect)
+        self.screen.blit(*self.centered_text("LEVEL COMPLETE!", self.font_large, WHITE,
+                                             (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)))
 
     def render_world_intro(self):
         """Render world intro screen"""
         self.screen.fill(BLACK)
         
-        text = self.font_large.render(f"WORLD {self.current_world}-{self.current_level}", True, WHITE)
-        text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 20))
-        self.screen.blit(text, text_rect)
+        world = f"WORLD {self.current_world}-{self.current_level}"
+        blits = [self.centered_text(world, self.font_large, WHITE, (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 20))]
         
         # Draw Mario and lives
         self.draw_mario(WINDOW_WIDTH // 2 - 40, WINDOW_HEIGHT // 2 + 20, True, PowerState.SMALL, 0)
-        text = self.font_medium.render(f"x {self.lives}", True, WHITE)
-        self.screen.blit(text, (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 35))
+        text = self.render_text(f"x {self.lives}", self.font_medium, WHITE)
+        blits.append((text, (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 35)))
+        self.fblits(blits)
 
     def render_victory(self):
         """Render victory screen"""
         # Animated background
-        blue_value = int(50 + math.sin(self.victory_timer * 0.05) * 30)
+        blue_value = int(50 + SINE_TABLE[int(self.victory_timer * (0.05 * SINE_SCALE)) & SINE_MASK] * 30)
         self.screen.fill((0, 0, blue_value))
         
-        # Firework particles
-        for particle in self.particles:
-            pygame.draw.circle(self.screen, particle.color, (int(particle.x), int(particle.y)), 3)
-        
-        # Victory text
-        text = self.font_large.render("CONGRATULATIONS!", True, COIN_YELLOW)
-        text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, 100))
-        self.screen.blit(text, text_rect)
-        
-        text = self.font_medium.render("You saved the Mushroom Kingdom!", True, WHITE)
-        text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, 150))
-        self.screen.blit(text, text_rect)
+        # Firework particles: prerendered disc sprites in one batched blit
+        count = self.particle_count
+        xs = (self.particle_xy[:count, 0].astype(np.int32) - 3).tolist()
+        ys = (self.particle_xy[:count, 1].astype(np.int32) - 3).tolist()
+        spark_sprites = self.spark_sprites
+        blits = []
+        for x, y, color in zip(xs, ys, map(tuple, self.particle_color[:count].tolist())):
+            sprite = spark_sprites.get(color)
+            if sprite is None:
+                sprite = spark_sprites[color] = self.build_spark_sprite(color)
+            blits.append((sprite, (x, y)))
+        self.fblits(blits)
+        
+        # Victory text; none of the text overlaps Mario, so it is all
+        # gathered into one batched blit
+        blits = [self.centered_text("CONGRATULATIONS!", self.font_large, COIN_YELLOW,
+                                    (WINDOW_WIDTH // 2, 100))]
+        
+        blits.append(self.centered_text("You saved the Mushroom Kingdom!", self.font_medium, WHITE,
+                                        (WINDOW_WIDTH // 2, 150)))
         
         # Mario celebration
-        mario_y = WINDOW_HEIGHT // 2 + int(math.sin(self.victory_timer * 0.1) * 10)
+        mario_y = WINDOW_HEIGHT // 2 + int(SINE_TABLE[int(self.victory_timer * (0.1 * SINE_SCALE)) & SINE_MASK] * 10)
         star_flash = (self.victory_timer // 5) % 2 == 0
         self.draw_mario(WINDOW_WIDTH // 2 - SCALED_TILE // 2, mario_y, True, 
                        PowerState.BIG, (self.victory_timer // 10) % 3, star_flash)
         
         # Final score
-        text = self.font_large.render(f"FINAL SCORE: {self.score}", True, WHITE)
-        text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 100))
-        self.screen.blit(text, text_rect)
+        blits.append(self.centered_text(f"FINAL SCORE: {self.score}", self.font_large, WHITE,
+                                        (WINDOW_WIDTH // 2, WINDOW_HEIGHT - 100)))
         
         # Credits
-        text = self.font_small.render("Created by Catsan / Team Flames", True, COIN_YELLOW)
-        text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 60))
-        self.screen.blit(text, text_rect)
+        blits.append(self.centered_text("Created by Catsan / Team Flames", self.font_small, COIN_YELLOW,
+                                        (WINDOW_WIDTH // 2, WINDOW_HEIGHT - 60)))
         
         # Restart prompt
-        if (self.anim_timer // 30) % 2 == 0:
-            text = self.font_small.render("Press ENTER to play again", True, WHITE)
-            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 30))
-            self.screen.blit(text, text_rect)
+        if self.prompt_visible:
+            blits.append(self.centered_text("Press ENTER to play again", self.font_small, WHITE,
+                                            (WINDOW_WIDTH // 2, WINDOW_HEIGHT - 30)))
+        
+        self.fblits(blits)
 
     def handle_key_down(self, key):
         """Handle key press events"""
@@ -1644,26 +2332,20 @@ class UltraMario2D:
                 self.start_game()
             return
         
-        if self.game_state in [GameState.GAME_OVER, GameState.VICTORY]:
+        if self.game_state in (GameState.GAME_OVER, GameState.VICTORY):
             if key == pygame.K_RETURN:
                 self.reset_game()
                 self.game_state = GameState.TITLE
             return
         
         if self.game_state == GameState.PLAYING:
-            if key in [pygame.K_LEFT, pygame.K_a]:
-                self.left_pressed = True
-            elif key in [pygame.K_RIGHT, pygame.K_d]:
-                self.right_pressed = True
-            elif key in [pygame.K_UP, pygame.K_w, pygame.K_SPACE, pygame.K_z]:
-                self.jump_pressed = True
-            elif key in [pygame.K_DOWN, pygame.K_s]:
-                self.down_pressed = True
-            elif key in [pygame.K_x, pygame.K_LSHIFT, pygame.K_RSHIFT]:
-                self.run_pressed = True
-                if self.player_power == PowerState.FIRE and not self.player_dead:
+            bit = KEY_BINDINGS.get(key)
+            if bit is not None:
+                self.input_state |= bit
+                if bit == INPUT_RUN and self.player_power == PowerState.FIRE and not self.player_dead:
                     self.shoot_fireball()
             elif key == pygame.K_p:
+                self.overlay.set_alpha(150)
                 self.game_state = GameState.PAUSED
             elif key == pygame.K_ESCAPE:
                 self.game_state = GameState.TITLE
@@ -1675,31 +2357,23 @@ class UltraMario2D:
 
     def handle_key_up(self, key):
         """Handle key release events"""
-        if key in [pygame.K_LEFT, pygame.K_a]:
-            self.left_pressed = False
-        elif key in [pygame.K_RIGHT, pygame.K_d]:
-            self.right_pressed = False
-        elif key in [pygame.K_UP, pygame.K_w, pygame.K_SPACE, pygame.K_z]:
-            self.jump_pressed = False
-            self.jump_held = False
-        elif key in [pygame.K_DOWN, pygame.K_s]:
-            self.down_pressed = False
-        elif key in [pygame.K_x, pygame.K_LSHIFT, pygame.K_RSHIFT]:
-            self.run_pressed = False
+        bit = KEY_BINDINGS.get(key)
+        if bit is not None:
+            self.input_state &= ~bit
+            if bit == INPUT_JUMP:
+                self.jump_held = False
 
     def shoot_fireball(self):
         """Shoot a fireball"""
         # Limit fireballs
-        fireball_count = sum(1 for e in self.entities if e.type == "fireball")
-        if fireball_count >= 2:
+        if self.fireball_count >= 2:
             return
         
-        fireball = Entity("fireball",
-                         self.player_x + (SCALED_TILE if self.player_facing_right else -8),
-                         self.player_y + SCALED_TILE // 2)
+        fireball = self.spawn_entity(EntityType.FIREBALL,
+                                     self.player_x + (SCALED_TILE if self.player_facing_right else -8),
+                                     self.player_y + SCALED_TILE // 2)
         fireball.vel_x = 8 if self.player_facing_right else -8
         fireball.vel_y = 0
-        self.entities.append(fireball)
 
     def start_game(self):
         """Start a new game"""